@@ -8,21 +8,81 @@ import asyncio
 import aiohttp
 from typing import Optional
 
+# Shared formatter - just the message, emojis included
+BACKEND_LOG_FORMATTER = logging.Formatter('%(message)s')
+
+
 class BackendLogHandler(logging.Handler):
     """
     Logging handler that sends log messages to backend API
     Use this to automatically stream ALL logs to your backend
+
+    emit() only enqueues the record; a background task posts queued records
+    in batches over a keep-alive connection pool shared by every handler instance.
     """
 
-    def __init__(self, session_id: str, backend_url: str = "http://localhost:8000"):
+    # Shared HTTP session (connection pool) across all handler instances
+    _http_session: Optional[aiohttp.ClientSession] = None
+    # Handlers not yet closed - the shared session is released when the last one closes
+    _open_handlers: int = 0
+
+    def __init__(
+        self,
+        session_id: str,
+        backend_url: str = "http://localhost:8000",
+        max_queue_size: int = 1000,
+        batch_size: int = 64,
+        flush_interval: float = 0.05
+    ):
         super().__init__()
         self.session_id = session_id
         self.backend_url = backend_url
+        self.batch_url = f"{backend_url}/api/agents/{session_id}/log/batch"
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size  # Max records per POST
+        self.flush_interval = flush_interval  # Max seconds a record waits for its batch to fill
         self.loop = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._closed = False
+        self.setFormatter(BACKEND_LOG_FORMATTER)
+        BackendLogHandler._open_handlers += 1
+
+    @classmethod
+    def _get_http_session(cls) -> aiohttp.ClientSession:
+        """Lazily create the shared pooled session (must be called inside the event loop)"""
+        if cls._http_session is None or cls._http_session.closed:
+            cls._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    keepalive_timeout=30,
+                    ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=2)
+            )
+        return cls._http_session
+
+    def filter(self, record: logging.LogRecord):
+        """Skip records this handler already queued (it can be attached to several loggers)"""
+        seen = record.__dict__.setdefault('_backend_handlers', set())
+        if id(self) in seen:
+            return False
+        seen.add(id(self))
+        return super().filter(record)
 
     def emit(self, record: logging.LogRecord):
-        """Send log record to backend"""
+        """Queue log record for the backend"""
+        if self._closed:
+            return  # Never restart the sender after aclose()
+
         try:
+            # Only the event loop thread may touch the queue
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # No event loop available
+
             # Format the log message
             message = self.format(record)
 
@@ -36,21 +96,6 @@ class BackendLogHandler(logging.Handler):
             }
             status = status_map.get(record.levelname, 'info')
 
-            # Send to backend asynchronously
-            if self.loop is None:
-                try:
-                    self.loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    return  # No event loop available
-
-            self.loop.create_task(self._send_log(status, message, record))
-
-        except Exception:
-            self.handleError(record)
-
-    async def _send_log(self, status: str, message: str, record: logging.LogRecord):
-        """Actually send the log to backend"""
-        try:
             event = {
                 "status": status,
                 "message": message,
@@ -59,17 +104,84 @@ class BackendLogHandler(logging.Handler):
                 "logger": record.name
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.backend_url}/api/agents/{self.session_id}/log",
-                    json=event,
-                    timeout=aiohttp.ClientTimeout(total=2)
-                ) as resp:
-                    pass  # Ignore response
+            # Start the background sender on first use
+            if self.queue is None or self.loop is not loop:
+                self.loop = loop
+                self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+                self._consumer = loop.create_task(self._consume())
+
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # Drop rather than block the agent if backend can't keep up
+
+        except Exception:
+            self.handleError(record)
+
+    async def _consume(self):
+        """Collect queued log events into batches and post them to the backend"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            # Keep filling until the batch is full or the flush interval elapses
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._send_logs(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _send_logs(self, events: list):
+        """Actually send a batch of logs to backend"""
+        try:
+            session = self._get_http_session()
+            async with session.post(self.batch_url, json=events) as resp:
+                pass  # Ignore response
 
         except Exception:
             pass  # Don't fail if backend is down
 
+    async def aclose(self, timeout: float = 2.0):
+        """Flush pending logs and stop the sender (detach the handler from its loggers first)
+
+        The shared HTTP session is closed only once the last open handler closes.
+        """
+        if self._closed:
+            return
+        self._closed = True  # emit() drops anything logged from here on
+
+        if self.queue is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass  # Give up on whatever is left
+
+        consumer = self._consumer
+        self.queue = None
+        self._consumer = None
+        if consumer is not None:
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+        BackendLogHandler._open_handlers -= 1
+        if BackendLogHandler._open_handlers > 0:
+            return  # Other live handlers still post through the shared session
+
+        session = BackendLogHandler._http_session
+        BackendLogHandler._http_session = None
+        if session is not None and not session.closed:
+            await session.close()
+
 
 # How to use in your agent.py:
 
@@ -83,17 +195,12 @@ async def entrypoint(ctx: agents.JobContext):
     # Add backend logging handler (if backend is available)
     backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
     if os.getenv("ENABLE_BACKEND_LOGGING", "false").lower() == "true":
-        # Create handler
+        # Create handler (uses the shared '%(message)s' formatter)
         backend_handler = BackendLogHandler(
             session_id=session_id,
             backend_url=backend_url
         )
 
-        # Set format
-        backend_handler.setFormatter(
-            logging.Formatter('%(message)s')  # Just the message, emojis included
-        )
-
         # Add to your loggers
         logging.getLogger("multi-agent").addHandler(backend_handler)
         logging.getLogger("call-analytics").addHandler(backend_handler)
@@ -102,4 +209,9 @@ async def entrypoint(ctx: agents.JobContext):
         print(f"✅ Backend logging enabled for session: {session_id}")
 
     # Rest of your code...
+
+    # On shutdown, detach the handler, then flush queued logs:
+    for name in ("multi-agent", "call-analytics", "transcription"):
+        logging.getLogger(name).removeHandler(backend_handler)
+    await backend_handler.aclose()
 """
@@ -9,7 +9,7 @@ import logging
 import os
 import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, AsyncGenerator
+from typing import Optional, Dict, Any, AsyncGenerator, List
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
@@ -198,6 +198,16 @@ async def log_event(session_id: str, event: Dict[str, Any]):
     await event_bus.publish(session_id, event)
     return {"status": "ok"}
 
+@app.post("/api/agents/{session_id}/log/batch")
+async def log_events_batch(session_id: str, events: List[Dict[str, Any]]):
+    """
+    Batched variant of the log endpoint
+    BackendLogHandler posts queued log records here in a single request
+    """
+    for event in events:
+        await event_bus.publish(session_id, event)
+    return {"status": "ok", "count": len(events)}
+
 # ============= AGENT DASHBOARD CRUD ENDPOINTS =============
 
 @app.get("/api/agents")
@@ -6,6 +6,7 @@ Supports both dev mode (auto-join rooms) and production mode (specific room)
 import asyncio
 import logging
 import os
+import signal
 import sys
 from datetime import datetime
 
@@ -175,6 +176,15 @@ async def run_specific_agent(agent_id: str, room_name: str):
 
         logger.info(f"🎉 {agent_manager.processed_spec.agent_type} is now active!")
 
+        # Stop on SIGINT/SIGTERM via the running loop, so cleanup below still runs
+        shutdown = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, shutdown.set)
+            except NotImplementedError:
+                pass  # Not supported on this platform (e.g. Windows)
+
         # Keep running until room ends or becomes empty
         try:
             while room_instance.connection_state == rtc.ConnectionState.CONN_CONNECTED:
@@ -183,15 +193,27 @@ async def run_specific_agent(agent_id: str, room_name: str):
                 if num_participants == 0:
                     logger.info(f"🏃 Room empty ({num_participants} participants), exiting...")
                     break
-                await asyncio.sleep(1)
+                try:
+                    await asyncio.wait_for(shutdown.wait(), timeout=1)
+                    logger.info("🛑 Shutdown signal received, exiting...")
+                    break
+                except asyncio.TimeoutError:
+                    pass
         except Exception as e:
             logger.error(f"Error in room monitor loop: {e}")
 
         logger.info("🔌 Room disconnected, shutting down...")
 
-        # Explicitly disconnect
-        await room_instance.disconnect()
-        await session.aclose()
+        # Explicitly disconnect - session, room and analytics are independent, close them together
+        results = await asyncio.gather(
+            session.aclose(),
+            room_instance.disconnect(),
+            agent_manager.analytics.end_call(call_status='completed'),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"⚠️ Error during shutdown: {result}")
 
         logger.info("✅ Agent process exiting cleanly")
         sys.exit(0)
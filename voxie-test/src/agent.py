@@ -1,13 +1,18 @@
 from dotenv import load_dotenv
 from enum import Enum
+from functools import lru_cache
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+import copy
 import json
+import re
+import hashlib
 import asyncio
 import logging
-import threading
 import os
 import sys
+from secrets import token_hex
 
 # Add parent directory to path for backend logging
 sys.path.append('/Users/dxma/Desktop/voxie-clean')
@@ -32,6 +37,25 @@ except ImportError:
 load_dotenv(".env.local")
 logger = logging.getLogger("multi-agent")
 
+
+@dataclass
+class AgentConfig:
+    """Environment settings, read once at import time"""
+    agent_id: Optional[str] = None  # Load a saved agent instead of Voxie
+    backend_logging: bool = False
+    backend_url: str = "http://localhost:8000"
+
+    @classmethod
+    def from_env(cls) -> "AgentConfig":
+        return cls(
+            agent_id=os.getenv("AGENT_ID"),
+            backend_logging=os.getenv("ENABLE_BACKEND_LOGGING", "false").lower() == "true",
+            backend_url=os.getenv("BACKEND_URL", "http://localhost:8000"),
+        )
+
+
+CONFIG = AgentConfig.from_env()
+
 REQUIREMENT_TYPE_MAP = {
     "business_name": ["business_name", "name", "company_name"],
     "business_type": ["business_type", "industry", "sector", "business_industry", "cuisine"],
@@ -43,12 +67,20 @@ REQUIREMENT_TYPE_MAP = {
     "special_requirements": ["special", "requirement", "note", "instruction", "custom", "extra"],
 }
 
+# Exact alias -> internal type, checked before the substring scan
+REQUIREMENT_ALIAS_LOOKUP = {
+    alias: internal_type
+    for internal_type, aliases in REQUIREMENT_TYPE_MAP.items()
+    for alias in aliases
+}
+
 
 class AgentState(Enum):
     VOXIE_ACTIVE = "voxie"
     PROCESSING = "processing"
     DEMO_READY = "demo_ready"
     DEMO_ACTIVE = "demo"
+    HANDOFF_IN_PROGRESS = "handoff"
     COMPLETED = "completed"
 
 
@@ -57,11 +89,88 @@ class UserRequirements:
     business_type: Optional[str] = None
     business_name: Optional[str] = None
     target_audience: Optional[str] = None
-    main_functions: List[str] = field(default_factory=list)
+    # Shared empty tuple until the first add_* call swaps in a real list
+    main_functions: Sequence[str] = ()
     tone: Optional[str] = None
-    special_requirements: List[str] = field(default_factory=list)
+    special_requirements: Sequence[str] = ()
     contact_info: Dict[str, str] = field(default_factory=dict)
 
+    def __post_init__(self):
+        # Bumped on every mutation so derived views can be cached between changes
+        # (plain attributes, not fields - they stay out of asdict()/cache_key())
+        self._version = 0
+        self._summary_cache: Optional[Tuple[int, str]] = None
+
+    def set_field(self, name: str, value: str):
+        """Set a scalar requirement (business_name, business_type, tone, target_audience)"""
+        setattr(self, name, value)
+        self._version += 1
+
+    def set_contact(self, contact_type: str, value: str):
+        """Record a piece of contact info"""
+        self.contact_info[contact_type] = value
+        self._version += 1
+
+    def add_functions(self, functions: List[str]) -> List[str]:
+        """Append functions not already listed (case-insensitive); returns the ones added"""
+        seen = {func.lower() for func in self.main_functions}
+        added = []
+        for func in functions:
+            key = func.lower()
+            if key not in seen:
+                seen.add(key)
+                added.append(func)
+        if added:
+            if isinstance(self.main_functions, tuple):
+                self.main_functions = list(self.main_functions)
+            self.main_functions.extend(added)
+            self._version += 1
+        return added
+
+    def add_special_requirement(self, requirement: str) -> bool:
+        """Append a special requirement unless it is already listed (case-insensitive)"""
+        key = requirement.lower()
+        if any(existing.lower() == key for existing in self.special_requirements):
+            return False
+        if isinstance(self.special_requirements, tuple):
+            self.special_requirements = list(self.special_requirements)
+        self.special_requirements.append(requirement)
+        self._version += 1
+        return True
+
+    def get_summary(self) -> str:
+        """Multi-line summary of the requirements gathered so far (cached until the next change)"""
+        if self._summary_cache and self._summary_cache[0] == self._version:
+            return self._summary_cache[1]
+        summary = "\n".join((
+            "📊 Current requirements summary:",
+            f"   🏢 Business: {self.business_name}",
+            f"   🏷️ Type: {self.business_type}",
+            f"   🎯 Functions: {list(self.main_functions)}",
+        ))
+        self._summary_cache = (self._version, summary)
+        return summary
+
+    def cache_key(self) -> str:
+        """Stable digest of these requirements (values are kept verbatim - they end up in the instructions)"""
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class RequirementField:
+    """One requirement in a store_user_requirements_bulk call"""
+    type: str
+    value: str
+
+
+@dataclass(frozen=True)
+class BusinessTemplate:
+    voice: str
+    tone: str
+    functions: Tuple[str, ...]
+    sample_responses: Tuple[str, ...]
+
 
 @dataclass
 class ProcessedAgentSpec:
@@ -73,7 +182,100 @@ class ProcessedAgentSpec:
     business_context: Dict[str, Any]
 
 
+# Small talk while requirements are processed: the opener, then one line per engagement.
+# Kept constant so the realtime model sees identical prompt text on every call.
+PROCESSING_SMALLTALK = (
+    "Keep the user engaged with friendly small talk while I process their requirements. Say something like: 'Great! I'm working on creating your custom agent right now. This should only take a few moments. While I'm processing everything, is there anything specific you'd like your agent to be particularly good at?'",
+    "Keep the conversation going! Say something like: 'I'm configuring your agent's personality and functions right now. It's going to have access to our comprehensive knowledge base too, which is really exciting!'",
+    "Almost done! Say something like: 'Just putting the finishing touches on your agent now. I think you're going to love how it turns out!'",
+)
+# Seconds after processing starts at which PROCESSING_SMALLTALK[1:] are spoken
+PROCESSING_ENGAGEMENT_DELAYS = (3, 6)
+
+# Data-channel topic for processing progress updates
+PROGRESS_TOPIC = "voxie.processing"
+
+# Upper bound on requirements processing before we give up and apologise
+PROCESSING_TIMEOUT = 30.0
+
+# Strong references to fire-and-forget tasks (the loop only keeps weak ones)
+_background_tasks: Set[asyncio.Task] = set()
+
+# Cap on background handoff/processing work running at once; extra spawns wait their turn
+MAX_BACKGROUND_TASKS = 8
+_background_slots = asyncio.Semaphore(MAX_BACKGROUND_TASKS)
+
+
+def _log_task_exception(task: asyncio.Task):
+    """Shared done-callback: drop the reference and surface any failure"""
+    _background_tasks.discard(task)
+    if not task.cancelled() and (exc := task.exception()):
+        logger.error(f"❌ Background task {task.get_name()} failed", exc_info=exc)
+
+
+def _log_loop_exception(loop: asyncio.AbstractEventLoop, context: Dict[str, Any]):
+    """Loop-wide exception handler so unhandled task errors land in our logs"""
+    exc = context.get("exception")
+    logger.error(f"❌ asyncio: {context.get('message') or exc}", exc_info=exc)
+
+
+async def _bounded(coro):
+    """Run coro once a background slot is free"""
+    async with _background_slots:
+        return await coro
+
+
+def _spawn(coro) -> asyncio.Task:
+    """Run a coroutine in the background without losing its task or its exception"""
+    task = asyncio.create_task(_bounded(coro))
+    _background_tasks.add(task)
+    task.add_done_callback(_log_task_exception)
+    return task
+
+
+# Voxie's consistent voice
+VOXIE_VOICE = "marin"
+
+
+@lru_cache(maxsize=None)
+def get_realtime_model(voice: str) -> openai.realtime.RealtimeModel:
+    """Shared RealtimeModel per voice - each AgentSession opens its own realtime
+    connection from it, so handoffs don't rebuild the model and its HTTP client"""
+    return openai.realtime.RealtimeModel(voice=voice)
+
+
+# Upper bound on waiting for a reply to finish playing before a handoff continues anyway
+REPLY_PLAYOUT_TIMEOUT = 15.0
+
+
+async def _wait_for_playout(handle) -> None:
+    """Wait until a generate_reply() speech handle has finished playing out"""
+    try:
+        await asyncio.wait_for(handle.wait_for_playout(), timeout=REPLY_PLAYOUT_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Reply playout did not finish within {REPLY_PLAYOUT_TIMEOUT}s, continuing handoff")
+
+
 class AgentManager:
+    # Fixed attribute set - this object is read on every tool call and handoff
+    __slots__ = (
+        "state",
+        "user_requirements",
+        "processed_spec",
+        "current_session",
+        "room",
+        "demo_completed",
+        "context",
+        "current_agent_id",
+        "analytics",
+        "transcription",
+        "backend_log_handler",
+        "disconnect_handler_room",
+        "processing_task",
+        "handoff_lock",
+        "apology_handle",
+    )
+
     def __init__(self):
         self.state = AgentState.VOXIE_ACTIVE
         self.user_requirements = UserRequirements()
@@ -85,6 +287,11 @@ class AgentManager:
         self.current_agent_id = None  # Track saved agent ID for reproducibility
         self.analytics: Optional[CallAnalytics] = None  # Call analytics tracking
         self.transcription: Optional[TranscriptionHandler] = None  # Transcription handler
+        self.backend_log_handler = None  # BackendLogHandler streaming logs to the frontend
+        self.disconnect_handler_room = None  # Room the "disconnected" handler is attached to
+        self.processing_task: Optional[asyncio.Task] = None  # In-flight process_requirements task
+        self.handoff_lock = asyncio.Lock()  # Serialises the state check + transition of a handoff
+        self.apology_handle = None  # SpeechHandle of the last "processing failed" apology
 
     async def log_interaction(self, speaker: str, message: str, agent_name: str = None, function_called: str = None):
         """Helper to log conversation turns to analytics"""
@@ -138,17 +345,63 @@ class AgentManager:
             except Exception as e:
                 logger.error(f"❌ Failed to end session with analytics: {e}")
 
-    async def transition_to_processing(self):
-        """Start background processing of requirements"""
+    def _interrupt_apology(self):
+        """Stop a still-playing processing-failure apology"""
+        if self.apology_handle and not self.apology_handle.done():
+            self.apology_handle.interrupt()
+        self.apology_handle = None
+
+    async def cleanup(self, timeout: float = 2.0):
+        """Cancel any in-flight requirements processing and wait for it to unwind"""
+        self._interrupt_apology()
+        task = self.processing_task
+        self.processing_task = None
+        if task is None or task.done():
+            return
+
+        # Deliver the cancel on the task's own loop - this may be called from a shutdown hook
+        task.get_loop().call_soon_threadsafe(task.cancel)
+        try:
+            await asyncio.wait({task}, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Processing task did not unwind cleanly: {e}")
+        logger.info("🧹 Cancelled in-flight requirements processing")
+
+    async def publish_progress(self, message: str):
+        """Push a processing status update to the room's data channel for the frontend"""
+        if not self.room:
+            return
+        try:
+            payload = json.dumps({"type": "processing_progress", "message": message})
+            await self.room.local_participant.publish_data(payload, topic=PROGRESS_TOPIC)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to publish progress update: {e}")
+
+    def begin_processing(self) -> bool:
+        """Claim the PROCESSING state inline; False if processing is already under way"""
+        if self.state == AgentState.PROCESSING:
+            return False
         logger.info("🔄 Starting transition to processing state")
         self.state = AgentState.PROCESSING
         logger.info("✅ State changed to PROCESSING")
+        return True
+
+    async def begin_demo_again(self) -> bool:
+        """Re-arm DEMO_READY for a repeat demo; False unless Voxie is idle in control"""
+        async with self.handoff_lock:
+            if self.state != AgentState.VOXIE_ACTIVE or not self.processed_spec:
+                return False
+            self.state = AgentState.DEMO_READY
+            return True
+
+    async def transition_to_processing(self):
+        """Run background processing of requirements (call begin_processing() first)"""
 
         # Start small talk while processing
         if self.current_session:
             logger.info("💬 Starting small talk during processing")
             await self.current_session.generate_reply(
-                instructions="Keep the user engaged with friendly small talk while I process their requirements. Say something like: 'Great! I'm working on creating your custom agent right now. This should only take a few moments. While I'm processing everything, is there anything specific you'd like your agent to be particularly good at?'"
+                instructions=PROCESSING_SMALLTALK[0]
             )
 
         # Process requirements in background with periodic updates
@@ -157,27 +410,38 @@ class AgentManager:
 
         try:
             # Start processing with periodic engagement
-            processing_task = asyncio.create_task(processing_agent.process_requirements(self.user_requirements))
-
-            # Engage user during processing
-            engagement_count = 0
-            while not processing_task.done():
-                await asyncio.sleep(3)  # Wait 3 seconds
-                if not processing_task.done() and self.current_session and engagement_count < 2:
-                    engagement_count += 1
-                    logger.info(f"💬 Engaging user during processing (attempt {engagement_count})")
-
-                    if engagement_count == 1:
-                        await self.current_session.generate_reply(
-                            instructions="Keep the conversation going! Say something like: 'I'm configuring your agent's personality and functions right now. It's going to have access to our comprehensive knowledge base too, which is really exciting!'"
-                        )
-                    elif engagement_count == 2:
-                        await self.current_session.generate_reply(
-                            instructions="Almost done! Say something like: 'Just putting the finishing touches on your agent now. I think you're going to love how it turns out!'"
+            processing_task = asyncio.create_task(
+                processing_agent.process_requirements(self.user_requirements, progress_cb=self.publish_progress)
+            )
+            self.processing_task = processing_task
+
+            # Engage user during processing - wake up either at the next engagement
+            # deadline or as soon as processing finishes, whichever comes first
+            # generate_reply() only schedules the speech - keep the handles instead of awaiting
+            # them so the replies never hold up the processing result
+            engagement_handles = []
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            try:
+                for engagement_count, delay in enumerate(PROCESSING_ENGAGEMENT_DELAYS, 1):
+                    timeout = max(started + delay - loop.time(), 0)
+                    done, _ = await asyncio.wait({processing_task}, timeout=timeout)
+                    if processing_task in done:
+                        break
+                    if self.current_session:
+                        logger.info(f"💬 Engaging user during processing (attempt {engagement_count})")
+                        engagement_handles.append(
+                            self.current_session.generate_reply(instructions=PROCESSING_SMALLTALK[engagement_count])
                         )
 
-            # Get the result
-            self.processed_spec = await processing_task
+                # Get the result - wait_for cancels the task if the deadline passes
+                remaining = max(started + PROCESSING_TIMEOUT - loop.time(), 0)
+                self.processed_spec = await asyncio.wait_for(processing_task, timeout=remaining)
+            finally:
+                # Don't let a late engagement reply talk over the "demo ready" announcement
+                for handle in engagement_handles:
+                    if not handle.done():
+                        handle.interrupt()
             logger.info(f"✅ Processing complete! Created spec: {self.processed_spec.agent_type}")
 
             # 🔖 SAVE AGENT CONFIGURATION TO DATABASE FOR REPRODUCIBILITY
@@ -190,8 +454,9 @@ class AgentManager:
                 session_id = str(id(self.current_session)) if self.current_session else None
                 room_id = self.room.name if self.room else None
 
-                # Save to Supabase
-                agent_id = AgentPersistence.save_agent_config(
+                # Save to Supabase (supabase-py is sync - keep it off the event loop)
+                agent_id = await asyncio.to_thread(
+                    AgentPersistence.save_agent_config,
                     user_requirements=user_req_dict,
                     processed_spec=processed_spec_dict,
                     session_id=session_id,
@@ -209,9 +474,15 @@ class AgentManager:
                 # Continue anyway - this is not critical for agent functionality
 
         except Exception as e:
-            logger.error(f"❌ Processing failed: {e}")
+            if isinstance(e, asyncio.TimeoutError):
+                logger.error(f"❌ Processing timed out after {PROCESSING_TIMEOUT}s")
+            else:
+                logger.error(f"❌ Processing failed: {e}")
+            # Hand the conversation back straight away - the apology plays out on its own
+            self.state = AgentState.VOXIE_ACTIVE
+            self._interrupt_apology()
             if self.current_session:
-                await self.current_session.generate_reply(
+                self.apology_handle = self.current_session.generate_reply(
                     instructions="I'm sorry, there was an issue creating your agent. Let me try again or help you with something else."
                 )
             return
@@ -267,16 +538,16 @@ class AgentManager:
         self.user_requirements = preconfigured_requirements
 
         processing_agent = ProcessingAgent()
-        template = {
-            "voice": "echo",
-            "tone": preconfigured_requirements.tone,
-            "functions": ["general_inquiry", "business_hours"],
-            "sample_responses": [
+        template = BusinessTemplate(
+            voice="echo",
+            tone=preconfigured_requirements.tone,
+            functions=("general_inquiry", "business_hours"),
+            sample_responses=(
                 greeting,
                 "I'd love to help you set up a test drive—do you have a model in mind?",
                 "Happy to walk you through financing or trim options whenever you're ready."
-            ]
-        }
+            )
+        )
 
         base_instructions = processing_agent._build_instructions(preconfigured_requirements, template)
         base_instructions += (
@@ -312,7 +583,7 @@ class AgentManager:
             instructions=base_instructions,
             voice="echo",
             functions=functions,
-            sample_responses=template["sample_responses"],
+            sample_responses=list(template.sample_responses),
             business_context={
                 "business_name": preconfigured_requirements.business_name,
                 "business_type": preconfigured_requirements.business_type,
@@ -335,7 +606,8 @@ class AgentManager:
             session_id = str(id(self.current_session)) if self.current_session else None
             room_id = self.room.name if self.room else None
 
-            agent_id = AgentPersistence.save_agent_config(
+            agent_id = await asyncio.to_thread(
+                AgentPersistence.save_agent_config,
                 user_requirements=user_req_dict,
                 processed_spec=processed_spec_dict,
                 session_id=session_id,
@@ -350,7 +622,7 @@ class AgentManager:
 
         if self.room:
             logger.info("🚀 Initiating immediate handoff to demo via shortcut")
-            asyncio.create_task(self.handoff_to_demo(self.room))
+            _spawn(self.handoff_to_demo(self.room))
         else:
             logger.warning("⚠️ Room context missing; cannot start demo handoff yet")
 
@@ -364,41 +636,47 @@ class AgentManager:
         logger.info(f"🔄 Handoff requested. Current state: {self.state}")
         logger.info(f"🔍 Processed spec exists: {self.processed_spec is not None}")
 
-        if self.state == AgentState.DEMO_READY and self.processed_spec:
-            logger.info("✅ Handoff conditions met - starting handoff process")
+        # Claim the handoff atomically - anything racing us sees HANDOFF_IN_PROGRESS and bails
+        async with self.handoff_lock:
+            if self.state != AgentState.DEMO_READY or not self.processed_spec:
+                logger.warning(f"❌ Handoff failed - State: {self.state}, Spec exists: {self.processed_spec is not None}")
+                return
+            self.state = AgentState.HANDOFF_IN_PROGRESS
+            session = self.current_session
+            spec = self.processed_spec
+            self.current_session = None
+
+        logger.info("✅ Handoff conditions met - starting handoff process")
 
+        session_closed = False
+        demo_session = None
+        try:
             # PROPERLY STOP VOXIE SESSION FIRST
-            if self.current_session:
+            if session:
                 logger.info("💬 Voxie announcing handoff")
-                await self.current_session.generate_reply(
-                    instructions=f"Perfect! I've created your {self.processed_spec.agent_type} and it's ready for testing. I'm now connecting you to your new agent. When you're done testing, just ask to speak with Voxie again and I'll be here to help with any adjustments. Here we go!"
+                handle = session.generate_reply(
+                    instructions=f"Perfect! I've created your {spec.agent_type} and it's ready for testing. I'm now connecting you to your new agent. When you're done testing, just ask to speak with Voxie again and I'll be here to help with any adjustments. Here we go!"
                 )
 
-                # Wait longer for message delivery
+                # Wait until the announcement has actually finished playing
                 logger.info("⏳ Waiting for message delivery...")
-                await asyncio.sleep(5)
+                await _wait_for_playout(handle)
 
                 # PROPERLY CLOSE VOXIE SESSION
                 logger.info("🔒 Closing Voxie session...")
-                await self.current_session.aclose()
+                session_closed = True
+                await session.aclose()
                 logger.info("✅ Voxie session closed")
 
-                # Clear current session
-                self.current_session = None
-
             # Create demo agent with DIFFERENT VOICE (not coral)
-            logger.info(f"🏗️ Creating demo agent: {self.processed_spec.agent_type}")
-            try:
-                demo_agent = DemoAgentCreator.create_agent(self.processed_spec)
-                logger.info("✅ Demo agent created successfully")
-            except Exception as e:
-                logger.error(f"❌ Demo agent creation failed: {e}")
-                return
+            logger.info(f"🏗️ Creating demo agent: {spec.agent_type}")
+            demo_agent = DemoAgentCreator.create_agent(spec)
+            logger.info("✅ Demo agent created successfully")
 
             # Create new session with demo agent (different voice from Voxie's coral)
-            logger.info(f"🎵 Creating new session with voice: {self.processed_spec.voice}")
+            logger.info(f"🎵 Creating new session with voice: {spec.voice}")
             demo_session = AgentSession(
-                llm=openai.realtime.RealtimeModel(voice=self.processed_spec.voice)
+                llm=get_realtime_model(spec.voice)
             )
 
             logger.info("🚀 Starting demo session...")
@@ -410,50 +688,60 @@ class AgentManager:
                 ),
             )
 
-            # Wait a moment before demo agent speaks
-            logger.info("⏳ Waiting before demo agent introduction...")
-            await asyncio.sleep(3)
-
             # Demo agent introduces itself
-            business_name = self.processed_spec.business_context.get("business_name", "our business")
+            business_name = spec.business_context.get("business_name", "our business")
             logger.info(f"💬 Demo agent introducing itself for: {business_name}")
             await demo_session.generate_reply(
-                instructions=f"Hello! I'm your new {self.processed_spec.agent_type} for {business_name}. I'm here to help you with your needs. You can try out my features - I can help with various services and I also have access to our comprehensive knowledge base. When you're ready to go back to Voxie for feedback, just let me know. How can I assist you today?"
+                instructions=f"Hello! I'm your new {spec.agent_type} for {business_name}. I'm here to help you with your needs. You can try out my features - I can help with various services and I also have access to our comprehensive knowledge base. When you're ready to go back to Voxie for feedback, just let me know. How can I assist you today?"
             )
+        except BaseException:
+            # Don't leave the manager stuck in HANDOFF_IN_PROGRESS - put it back so the handoff can be retried
+            logger.warning("⚠️ Handoff to demo failed - restoring DEMO_READY")
+            await self._abandon_handoff(demo_session)
+            self.state = AgentState.DEMO_READY
+            self.current_session = None if session_closed else session
+            raise
+
+        self.state = AgentState.DEMO_ACTIVE
+        self.current_session = demo_session
+        logger.info("✅ Handoff complete - demo agent is now active")
 
-            self.state = AgentState.DEMO_ACTIVE
-            self.current_session = demo_session
-            logger.info("✅ Handoff complete - demo agent is now active")
-        else:
-            logger.warning(f"❌ Handoff failed - State: {self.state}, Spec exists: {self.processed_spec is not None}")
-            
     async def handoff_back_to_voxie(self, room):
         """Handoff from Demo back to Voxie"""
-        if self.state == AgentState.DEMO_ACTIVE:
-            logger.info("Handing back to Voxie")
-            self.demo_completed = True  # Mark demo as completed
-            
+        async with self.handoff_lock:
+            if self.state != AgentState.DEMO_ACTIVE:
+                logger.warning(f"❌ Handoff back to Voxie skipped - State: {self.state}")
+                return
+            self.state = AgentState.HANDOFF_IN_PROGRESS
+            session = self.current_session
+            spec = self.processed_spec
+            self.current_session = None
+
+        logger.info("Handing back to Voxie")
+        self.demo_completed = True  # Mark demo as completed
+
+        session_closed = False
+        voxie_session = None
+        try:
             # PROPERLY STOP DEMO SESSION
-            if self.current_session:
-                await self.current_session.generate_reply(
+            if session:
+                handle = session.generate_reply(
                     instructions="Thank you for testing me out! I'm now connecting you back to Voxie who can help with any changes or next steps. Have a great day!"
                 )
-                
-                # Wait longer for message delivery
-                await asyncio.sleep(5)
-                
+
+                # Wait until the goodbye has actually finished playing
+                await _wait_for_playout(handle)
+
                 # PROPERLY CLOSE DEMO SESSION
-                await self.current_session.aclose()
+                session_closed = True
+                await session.aclose()
                 logger.info("Demo session closed")
-                
-                # Clear current session
-                self.current_session = None
-            
+
             # Create new Voxie session (always use coral voice for Voxie)
             voxie_session = AgentSession(
-                llm=openai.realtime.RealtimeModel(voice="marin")  # Voxie's consistent voice
+                llm=get_realtime_model(VOXIE_VOICE)
             )
-            
+
             await voxie_session.start(
                 room=room,
                 agent=VoxieAgent(),
@@ -461,32 +749,41 @@ class AgentManager:
                     noise_cancellation=noise_cancellation.BVC(),
                 ),
             )
-            
-            # Wait a moment before Voxie speaks
-            await asyncio.sleep(5)
-            
+
             # Voxie comes back with context
-            business_type = self.processed_spec.business_context.get("business_type", "custom")
-            business_name = self.processed_spec.business_context.get("business_name", "your business")
-            
+            business_type = spec.business_context.get("business_type", "custom")
+            business_name = spec.business_context.get("business_name", "your business")
+
             await voxie_session.generate_reply(
                 instructions=f"Hi again! I'm Voxie, back to help you. How did the demo of your {business_type} agent for {business_name} go? Did it work as expected? Would you like to make any adjustments to the tone, functions, or anything else? Or if you're satisfied, I can help you close our session."
             )
-            
-            self.state = AgentState.VOXIE_ACTIVE
-            self.current_session = voxie_session
+        except BaseException:
+            logger.warning("⚠️ Handoff back to Voxie failed - restoring DEMO_ACTIVE")
+            await self._abandon_handoff(voxie_session)
+            self.state = AgentState.DEMO_ACTIVE
+            self.current_session = None if session_closed else session
+            raise
+
+        self.state = AgentState.VOXIE_ACTIVE
+        self.current_session = voxie_session
+
+    @staticmethod
+    async def _abandon_handoff(new_session):
+        """Best-effort close of a half-started session from a failed handoff"""
+        if new_session is None:
+            return
+        try:
+            await new_session.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close abandoned session: {e}")
 
 
 # Global agent manager
 agent_manager = AgentManager()
 
 
-class VoxieAgent(Agent):
-    """Manager agent that collects user requirements"""
-    
-    def __init__(self):
-        super().__init__(
-            instructions="""
+# Voxie's system prompt - a single module-level constant shared by every VoxieAgent
+VOXIE_SYSTEM_PROMPT = """
 
 ROLE
 
@@ -623,6 +920,7 @@ OBJECTION HANDLING
 KEY REMINDERS
 	•	Always listen before proposing
 	•	Summarize back user needs to confirm understanding
+	•	When the user gives several details in one go (e.g. their business name, type and hours), save them with a single store_user_requirements_bulk call instead of one store_user_requirement call per detail
 	•	Keep your explanations simple and benefits-oriented
 	•	Position the agent as supportive, not replacing humans
 	•	Be clear, conversational, and concise
@@ -638,81 +936,121 @@ OUTCOMES TO TRACK
 	•	The core purpose/capabilities aligned with the user
 	•	User confidence that the proposed agent matches their needs
 """
-        )
 
+
+class VoxieAgent(Agent):
+    """Manager agent that collects user requirements"""
+    
+    def __init__(self):
+        super().__init__(instructions=VOXIE_SYSTEM_PROMPT)
+
+    @staticmethod
     def normalize_req_type(req_type: str) -> str:
         req_type_lower = req_type.lower().replace(" ", "_")
+        internal_type = REQUIREMENT_ALIAS_LOOKUP.get(req_type_lower)
+        if internal_type:
+            return internal_type
+        # Fuzzy fallback for compound names (e.g. "contact_email_address")
         for internal_type, aliases in REQUIREMENT_TYPE_MAP.items():
             if any(alias in req_type_lower for alias in aliases):
                 return internal_type
         return "unknown"
 
 
-    @function_tool
-    async def store_user_requirement(self, requirement_type: str, value: str):
-        logger.info(f"📝 Storing requirement: {requirement_type} = {value}")
-
-        # Log user interaction to transcription (for token estimation)
-        user_message = f"User provided {requirement_type}: {value}"
-        await agent_manager.log_interaction(
-            speaker="user",
-            message=user_message,
-            function_called="store_user_requirement"
-        )
-
+    @staticmethod
+    def apply_requirement(requirement_type: str, value: str):
+        """Store one requirement on the shared UserRequirements"""
         normalized_type = VoxieAgent.normalize_req_type(requirement_type)
 
         match normalized_type:
             case "business_name":
-                agent_manager.user_requirements.business_name = value
-                logger.info(f"✅ Set business name: {value}")
+                agent_manager.user_requirements.set_field("business_name", value)
+                logger.info("✅ Set business name: %s", value)
 
             case "business_type":
                 if "restaurant" in requirement_type.lower() or "cuisine" in requirement_type.lower():
                     value = f"{value} Restaurant"
-                agent_manager.user_requirements.business_type = value
-                logger.info(f"✅ Set business type: {value}")
+                agent_manager.user_requirements.set_field("business_type", value)
+                logger.info("✅ Set business type: %s", value)
 
             case "main_functions":
                 functions = [f.strip() for f in value.split(",") if f.strip()]
-                agent_manager.user_requirements.main_functions.extend(functions)
-                logger.info(f"✅ Added functions: {functions}")
+                added = agent_manager.user_requirements.add_functions(functions)
+                logger.info("✅ Added functions: %s", added)
 
             case "tone":
-                agent_manager.user_requirements.tone = value
-                logger.info(f"✅ Set tone: {value}")
+                agent_manager.user_requirements.set_field("tone", value)
+                logger.info("✅ Set tone: %s", value)
 
             case "target_audience":
-                agent_manager.user_requirements.target_audience = value
-                logger.info(f"✅ Set audience: {value}")
+                agent_manager.user_requirements.set_field("target_audience", value)
+                logger.info("✅ Set audience: %s", value)
 
             case "operating_hours":
-                agent_manager.user_requirements.special_requirements.append(f"Operating hours: {value}")
-                logger.info(f"✅ Added operating hours: {value}")
+                agent_manager.user_requirements.add_special_requirement(f"Operating hours: {value}")
+                logger.info("✅ Added operating hours: %s", value)
 
             case "contact_info":
                 # Try to extract contact type (e.g., "email", "phone")
                 contact_key = requirement_type.lower().replace("contact_", "")
-                agent_manager.user_requirements.contact_info[contact_key] = value
-                logger.info(f"✅ Added contact info: {contact_key} = {value}")
+                agent_manager.user_requirements.set_contact(contact_key, value)
+                logger.info("✅ Added contact info: %s = %s", contact_key, value)
 
             case "special_requirements":
-                agent_manager.user_requirements.special_requirements.append(value)
-                logger.info(f"✅ Added special requirement: {value}")
+                agent_manager.user_requirements.add_special_requirement(value)
+                logger.info("✅ Added special requirement: %s", value)
 
             case _:
                 # Fallback for anything else
-                agent_manager.user_requirements.special_requirements.append(f"{requirement_type}: {value}")
-                logger.warning(f"⚠️ Unclassified requirement. Saved under special requirements: {requirement_type}: {value}")
+                agent_manager.user_requirements.add_special_requirement(f"{requirement_type}: {value}")
+                logger.warning("⚠️ Unclassified requirement. Saved under special requirements: %s: %s", requirement_type, value)
+
+    @function_tool
+    async def store_user_requirement(self, requirement_type: str, value: str):
+        logger.info("📝 Storing requirement: %s = %s", requirement_type, value)
+
+        # Log user interaction to transcription (for token estimation)
+        user_message = f"User provided {requirement_type}: {value}"
+        await agent_manager.log_interaction(
+            speaker="user",
+            message=user_message,
+            function_called="store_user_requirement"
+        )
+
+        VoxieAgent.apply_requirement(requirement_type, value)
 
         # Summary log
-        logger.info(f"📊 Current requirements summary:")
-        logger.info(f"   🏢 Business: {agent_manager.user_requirements.business_name}")
-        logger.info(f"   🏷️ Type: {agent_manager.user_requirements.business_type}")
-        logger.info(f"   🎯 Functions: {agent_manager.user_requirements.main_functions}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(agent_manager.user_requirements.get_summary())
 
         return f"Stored {requirement_type}: {value}"
 
+    @function_tool
+    async def store_user_requirements_bulk(self, fields: List[RequirementField]):
+        """Store several requirements at once. Prefer this over store_user_requirement whenever the user gives two or more details in one turn.
+
+        Args:
+            fields: One {"type": <requirement type>, "value": <value>} item per detail, e.g. [{"type": "business_name", "value": "Acme"}, {"type": "business_type", "value": "SaaS"}]
+        """
+        pairs = [(item.type, item.value) for item in fields if item.type and item.value]
+        logger.info("📝 Storing %s requirements: %s", len(pairs), pairs)
+
+        # One transcript entry for the whole batch
+        await agent_manager.log_interaction(
+            speaker="user",
+            message="; ".join(f"User provided {requirement_type}: {value}" for requirement_type, value in pairs),
+            function_called="store_user_requirements_bulk"
+        )
+
+        for requirement_type, value in pairs:
+            VoxieAgent.apply_requirement(requirement_type, value)
+
+        # Summary log
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(agent_manager.user_requirements.get_summary())
+
+        return "Stored " + ", ".join(f"{requirement_type}: {value}" for requirement_type, value in pairs)
+
 
     # async def store_user_requirement(self, requirement_type: str, value: str):
     #     """Store a user requirement during the conversation"""
@@ -779,36 +1117,43 @@ OUTCOMES TO TRACK
             return "What type of business would you like to create an agent for?"
     
 
-        logger.info(f"📊 Current requirements: Business={agent_manager.user_requirements.business_name}, Type={agent_manager.user_requirements.business_type}")
-        logger.info(f"🎯 Functions: {agent_manager.user_requirements.main_functions}")
+        logger.info("📊 Current requirements: Business=%s, Type=%s", agent_manager.user_requirements.business_name, agent_manager.user_requirements.business_type)
+        logger.info("🎯 Functions: %s", agent_manager.user_requirements.main_functions)
 
-        # Start background processing
+        # Switch state right away so a repeated finalize can't start a second run,
+        # then do the talking and processing in the background
+        if not agent_manager.begin_processing():
+            logger.info("⏭️ Processing already under way - not starting another run")
+            return "I'm already working on your agent - it'll be ready in just a moment!"
         logger.info("🚀 Creating processing task...")
-        asyncio.create_task(agent_manager.transition_to_processing())
+        _spawn(agent_manager.transition_to_processing())
 
         return "Perfect! I have all the information I need. Give me a few seconds to process everything and create your custom voice AI agent..."
 
     @function_tool
     async def start_demo(self):
         """Start the demo agent"""
-        logger.info(f"🎬 START_DEMO called - Current state: {agent_manager.state}")
-        logger.info(f"🔍 Processed spec exists: {agent_manager.processed_spec is not None}")
+        logger.info("🎬 START_DEMO called - Current state: %s", agent_manager.state)
+        logger.info("🔍 Processed spec exists: %s", agent_manager.processed_spec is not None)
 
         if agent_manager.state == AgentState.DEMO_READY:
             logger.info("✅ Triggering demo handoff...")
-            asyncio.create_task(agent_manager.handoff_to_demo(agent_manager.room))
+            _spawn(agent_manager.handoff_to_demo(agent_manager.room))
             return "Great! Let me connect you to your demo agent now..."
         else:
-            logger.warning(f"❌ Demo not ready - State: {agent_manager.state}")
+            logger.warning("❌ Demo not ready - State: %s", agent_manager.state)
             return "I'm still working on creating your agent. Just a moment more..."
     
     @function_tool
     async def try_demo_again(self):
         """Allow user to try the demo again after feedback"""
         if agent_manager.demo_completed and agent_manager.processed_spec:
+            # Only switches from VOXIE_ACTIVE, so it can't clobber a handoff that's still running
+            if not await agent_manager.begin_demo_again():
+                logger.info("Second demo requested while busy - State: %s", agent_manager.state)
+                return "Just a moment - I'm still switching things over. Ask me again in a second."
             logger.info("Voxie triggering second demo handoff")
-            agent_manager.state = AgentState.DEMO_READY  # Reset state for demo
-            asyncio.create_task(agent_manager.handoff_to_demo(agent_manager.room))
+            _spawn(agent_manager.handoff_to_demo(agent_manager.room))
             return "Perfect! Let me connect you to your updated demo agent now..."
         else:
             return "Let me first process your requirements and create your demo agent."
@@ -831,7 +1176,7 @@ OUTCOMES TO TRACK
     @function_tool
     async def ask_demo_preference(self):
         """Ask user if they want to try the demo or are satisfied"""
-        logger.info(f"🤔 ASK_DEMO_PREFERENCE called - Demo completed: {agent_manager.demo_completed}")
+        logger.info("🤔 ASK_DEMO_PREFERENCE called - Demo completed: %s", agent_manager.demo_completed)
         if agent_manager.demo_completed:
             return "Would you like to try the demo again with any updates, or are you satisfied with your agent? If you're all set, just let me know and I can close our session for you."
         else:
@@ -840,7 +1185,7 @@ OUTCOMES TO TRACK
     @function_tool
     async def check_processing_status(self):
         """Check the current processing status"""
-        logger.info(f"📋 CHECK_PROCESSING_STATUS called - Current state: {agent_manager.state}")
+        logger.info("📋 CHECK_PROCESSING_STATUS called - Current state: %s", agent_manager.state)
 
         if agent_manager.state == AgentState.PROCESSING:
             return "I'm still working on creating your agent. It should be ready in just a few more moments. I'm configuring all the features you requested!"
@@ -848,6 +1193,8 @@ OUTCOMES TO TRACK
             return "Great news! Your agent is ready to test. Would you like to try it out now?"
         elif agent_manager.state == AgentState.DEMO_ACTIVE:
             return "You're currently testing your demo agent. When you're done, just ask to speak with me again!"
+        elif agent_manager.state == AgentState.HANDOFF_IN_PROGRESS:
+            return "I'm switching you over right now - just a moment!"
         else:
             return "I'm here to help you create your custom agent. What type of business agent would you like to create?"
 
@@ -875,135 +1222,209 @@ class ProcessingAgent:
     """Background agent that processes requirements into structured data"""
     
     BUSINESS_TEMPLATES = {
-        "restaurant": {
-            "voice": "alloy",  # Different from Voxie's coral
-            "tone": "friendly and welcoming",
-            "functions": ["take_reservation", "menu_inquiry", "take_order"],
-            "sample_responses": [
+        "restaurant": BusinessTemplate(
+            voice="alloy",  # Different from Voxie's coral
+            tone="friendly and welcoming",
+            functions=("take_reservation", "menu_inquiry", "take_order"),
+            sample_responses=(
                 "Thank you for calling {business_name}! How can I help you today?",
                 "I'd be happy to help you make a reservation.",
-                "Let me check our menu for you."
-            ]
-        },
-        "dental": {
-            "voice": "nova",  # Different from Voxie's coral
-            "tone": "professional and reassuring",
-            "functions": ["schedule_appointment", "check_insurance", "emergency_info"],
-            "sample_responses": [
+                "Let me check our menu for you.",
+            ),
+        ),
+        "dental": BusinessTemplate(
+            voice="nova",  # Different from Voxie's coral
+            tone="professional and reassuring",
+            functions=("schedule_appointment", "check_insurance", "emergency_info"),
+            sample_responses=(
                 "Thank you for calling {business_name}. How may I assist you today?",
                 "I can help you schedule an appointment.",
-                "Let me check your insurance coverage."
-            ]
-        },
-        "pizza": {
-            "voice": "echo",  # Different from Voxie's coral
-            "tone": "casual and enthusiastic", 
-            "functions": ["take_order", "menu_inquiry", "take_reservation"],
-            "sample_responses": [
+                "Let me check your insurance coverage.",
+            ),
+        ),
+        "pizza": BusinessTemplate(
+            voice="echo",  # Different from Voxie's coral
+            tone="casual and enthusiastic",
+            functions=("take_order", "menu_inquiry", "take_reservation"),
+            sample_responses=(
                 "Hey there! Welcome to {business_name}! Ready to order some amazing pizza?",
                 "What can I get started for you today?",
-                "Let me tell you about our daily specials!"
-            ]
-        },
-        "retail": {
-            "voice": "alloy",  # Different from Voxie's coral
-            "tone": "helpful and professional",
-            "functions": ["check_product_availability", "store_hours"],
-            "sample_responses": [
+                "Let me tell you about our daily specials!",
+            ),
+        ),
+        "retail": BusinessTemplate(
+            voice="alloy",  # Different from Voxie's coral
+            tone="helpful and professional",
+            functions=("check_product_availability", "store_hours"),
+            sample_responses=(
                 "Hello and welcome to {business_name}! How can I help you today?",
                 "I can help you find what you're looking for.",
-                "Let me check if we have that in stock for you."
-            ]
-        },
-        "medical": {
-            "voice": "nova",  # Different from Voxie's coral
-            "tone": "caring and professional", 
-            "functions": ["schedule_appointment", "check_insurance", "emergency_info"],
-            "sample_responses": [
+                "Let me check if we have that in stock for you.",
+            ),
+        ),
+        "medical": BusinessTemplate(
+            voice="nova",  # Different from Voxie's coral
+            tone="caring and professional",
+            functions=("schedule_appointment", "check_insurance", "emergency_info"),
+            sample_responses=(
                 "Thank you for calling {business_name}. How may I help you today?",
                 "I can assist you with scheduling an appointment.",
-                "Let me help you with your medical needs."
-            ]
-        },
-        "general": {
-            "voice": "alloy",  # Different from Voxie's coral
-            "tone": "friendly and professional",
-            "functions": ["general_inquiry", "business_hours"],
-            "sample_responses": [
+                "Let me help you with your medical needs.",
+            ),
+        ),
+        "general": BusinessTemplate(
+            voice="alloy",  # Different from Voxie's coral
+            tone="friendly and professional",
+            functions=("general_inquiry", "business_hours"),
+            sample_responses=(
                 "Hello! Thank you for contacting {business_name}. How can I help you?",
                 "I'm here to assist you with any questions you may have.",
-                "How can I help you today?"
-            ]
-        }
+                "How can I help you today?",
+            ),
+        ),
+    }
+
+    # Static function definitions for template functions that take structured input
+    FUNCTION_DEFINITIONS = {
+        "take_reservation": {
+            "name": "take_reservation",
+            "description": "Take a restaurant reservation",
+            "parameters": ("date", "time", "party_size", "name", "phone")
+        },
+        "schedule_appointment": {
+            "name": "schedule_appointment",
+            "description": "Schedule a dental appointment",
+            "parameters": ("date", "time", "service_type", "patient_name", "phone")
+        },
+        "take_order": {
+            "name": "take_order",
+            "description": "Take a pizza order",
+            "parameters": ("items", "size", "quantity", "customer_info", "delivery_address")
+        },
+    }
+
+    # Sample responses pre-split around {business_name}, so filling them in is a plain join
+    _SAMPLE_RESPONSE_PARTS = {
+        business_type: tuple(tuple(resp.split("{business_name}")) for resp in template.sample_responses)
+        for business_type, template in BUSINESS_TEMPLATES.items()
+    }
+    # ...and already filled in for the common case of no business name
+    _DEFAULT_SAMPLE_RESPONSES = {
+        business_type: tuple("our business".join(parts) for parts in responses)
+        for business_type, responses in _SAMPLE_RESPONSE_PARTS.items()
     }
+
+    @classmethod
+    def _sample_responses(cls, business_type: str, business_name: Optional[str]) -> List[str]:
+        """Template sample responses with the business name filled in"""
+        if business_type not in cls._SAMPLE_RESPONSE_PARTS:
+            business_type = "general"
+        if not business_name:
+            return list(cls._DEFAULT_SAMPLE_RESPONSES[business_type])
+        return [business_name.join(parts) for parts in cls._SAMPLE_RESPONSE_PARTS[business_type]]
+
+    # Keywords per business type, in priority order (first matching type wins)
+    BUSINESS_TYPE_KEYWORDS = (
+        ("restaurant", ("restaurant", "indian", "food")),
+        ("dental", ("dental", "dentist")),
+        ("pizza", ("pizza",)),
+        ("retail", ("retail", "store", "shop")),
+        ("medical", ("medical", "clinic", "doctor", "healthcare", "hospital")),
+    )
+    _KEYWORD_PRIORITY = {
+        keyword: (priority, business_type)
+        for priority, (business_type, keywords) in enumerate(BUSINESS_TYPE_KEYWORDS)
+        for keyword in keywords
+    }
+    # One pass over the input finds every keyword; the lookahead keeps overlapping matches
+    _KEYWORD_PATTERN = re.compile(
+        "(?=(" + "|".join(re.escape(keyword) for keyword in _KEYWORD_PRIORITY) + "))"
+    )
+
+    @classmethod
+    def _determine_business_type(cls, business_type: Optional[str]) -> str:
+        """Map a free-text business type onto a BUSINESS_TEMPLATES key"""
+        if not business_type:
+            return "general"
+        matches = [cls._KEYWORD_PRIORITY[keyword] for keyword in cls._KEYWORD_PATTERN.findall(business_type.lower())]
+        return min(matches)[1] if matches else "general"
+
+    # Specs already built in this process, keyed by UserRequirements.cache_key(); callers get deep copies
+    _spec_cache: Dict[str, ProcessedAgentSpec] = {}
+    SPEC_CACHE_MAXSIZE = 256
     
-    async def process_requirements(self, requirements: UserRequirements) -> ProcessedAgentSpec:
-        """Convert user requirements into structured agent specification"""
+    async def process_requirements(
+        self,
+        requirements: UserRequirements,
+        progress_cb: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> ProcessedAgentSpec:
+        """Convert user requirements into structured agent specification
+
+        progress_cb, if given, is awaited with a short status message at each step.
+        """
         logger.info("🏭 Processing user requirements...")
-        logger.info(f"📋 Business type: {requirements.business_type}")
-        logger.info(f"🏢 Business name: {requirements.business_name}")
-        logger.info(f"🎯 Functions: {requirements.main_functions}")
+        logger.info("📋 Business type: %s", requirements.business_type)
+        logger.info("🏢 Business name: %s", requirements.business_name)
+        logger.info("🎯 Functions: %s", requirements.main_functions)
+
+        cache_key = requirements.cache_key()
+        cached_spec = self._spec_cache.get(cache_key)
+        if cached_spec:
+            logger.info("⚡ Reusing cached spec for %s", cached_spec.agent_type)
+            return copy.deepcopy(cached_spec)
 
-        # Simulate processing time with progress updates
         logger.info("⏳ Processing step 1/3: Analyzing business type...")
-        await asyncio.sleep(2)
+        if progress_cb:
+            await progress_cb("Analyzing business type...")
 
         # Determine business type from requirements
-        business_type = "general"  # Default
-        if requirements.business_type:
-            btype_lower = requirements.business_type.lower()
-            logger.info(f"🔍 Analyzing business type: '{btype_lower}'")
-            if "restaurant" in btype_lower or "indian" in btype_lower or "food" in btype_lower:
-                business_type = "restaurant"
-            elif "dental" in btype_lower or "dentist" in btype_lower:
-                business_type = "dental"
-            elif "pizza" in btype_lower:
-                business_type = "pizza"
-            elif "retail" in btype_lower or "store" in btype_lower or "shop" in btype_lower:
-                business_type = "retail"
-            elif "medical" in btype_lower or "clinic" in btype_lower or "doctor" in btype_lower or "healthcare" in btype_lower or "hospital" in btype_lower:
-                business_type = "medical"
-
-        logger.info(f"✅ Determined business type: {business_type}")
+        business_type = self._determine_business_type(requirements.business_type)
+
+        logger.info("✅ Determined business type: %s", business_type)
 
         logger.info("⏳ Processing step 2/3: Building agent specification...")
-        await asyncio.sleep(2)
+        if progress_cb:
+            await progress_cb("Building agent specification...")
 
         template = self.BUSINESS_TEMPLATES.get(business_type, self.BUSINESS_TEMPLATES["general"])
-        logger.info(f"📋 Using template: {business_type} with voice: {template['voice']}")
+        logger.info("📋 Using template: %s with voice: %s", business_type, template.voice)
 
         # Build agent specification
         spec = ProcessedAgentSpec(
             agent_type=f"{requirements.business_name or 'Custom'} {business_type.title()} Assistant",
             instructions=self._build_instructions(requirements, template),
-            voice=template["voice"],
+            voice=template.voice,
             functions=self._build_functions(requirements, template),
-            sample_responses=[
-                resp.format(business_name=requirements.business_name or "our business")
-                for resp in template["sample_responses"]
-            ],
+            sample_responses=self._sample_responses(business_type, requirements.business_name),
             business_context={
                 "business_type": business_type,
                 "business_name": requirements.business_name,
-                "tone": requirements.tone or template["tone"],
-                "functions": requirements.main_functions
+                "tone": requirements.tone or template.tone,
+                "functions": tuple(requirements.main_functions)  # snapshot, not the live list
             }
         )
 
         logger.info("⏳ Processing step 3/3: Finalizing configuration...")
-        await asyncio.sleep(1)
-
-        logger.info(f"🎉 Generated spec for {spec.agent_type}")
-        logger.info(f"🎵 Voice: {spec.voice}")
-        logger.info(f"🛠️ Functions: {len(spec.functions)} configured")
+        if progress_cb:
+            await progress_cb("Finalizing configuration...")
+
+        logger.info("🎉 Generated spec for %s", spec.agent_type)
+        logger.info("🎵 Voice: %s", spec.voice)
+        logger.info("🛠️ Functions: %s configured", len(spec.functions))
+
+        if len(self._spec_cache) >= self.SPEC_CACHE_MAXSIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del self._spec_cache[next(iter(self._spec_cache))]
+        # The cache keeps its own copy so callers can't change what later lookups get
+        self._spec_cache[cache_key] = copy.deepcopy(spec)
         return spec
     
-    def _build_instructions(self, req: UserRequirements, template: Dict) -> str:
+    def _build_instructions(self, req: UserRequirements, template: BusinessTemplate) -> str:
         """Build comprehensive agent instructions"""
         business_name = req.business_name or "the business"
-        tone = req.tone or template["tone"]
+        tone = req.tone or template.tone
 
-        instructions = f"""You are a {tone} AI assistant for {business_name}.
+        parts = [f"""You are a {tone} AI assistant for {business_name}.
 
 Your primary responsibilities:
 - Assist customers with their needs
@@ -1021,46 +1442,136 @@ Use these knowledge base tools whenever customers ask about:
 - Technical information
 - Any topic you're not immediately familiar with
 
-Always try to search the knowledge base first before giving generic answers."""
+Always try to search the knowledge base first before giving generic answers."""]
 
         if req.main_functions:
-            instructions += f"\n\nKey functions you can help with:\n"
-            for func in req.main_functions:
-                instructions += f"- {func}\n"
+            parts.append("\n\nKey functions you can help with:\n")
+            parts.extend(f"- {func}\n" for func in req.main_functions)
 
         if req.special_requirements:
-            instructions += f"\n\nSpecial requirements:\n"
-            for req_item in req.special_requirements:
-                instructions += f"- {req_item}\n"
+            parts.append("\n\nSpecial requirements:\n")
+            parts.extend(f"- {req_item}\n" for req_item in req.special_requirements)
 
-        return instructions
+        return "".join(parts)
     
-    def _build_functions(self, req: UserRequirements, template: Dict) -> List[Dict[str, Any]]:
+    def _build_functions(self, req: UserRequirements, template: BusinessTemplate) -> List[Dict[str, Any]]:
         """Build function definitions for the agent"""
-        functions = []
-        
-        # Add template functions
-        for func_name in template["functions"]:
-            if func_name == "take_reservation":
-                functions.append({
-                    "name": "take_reservation",
-                    "description": "Take a restaurant reservation",
-                    "parameters": ["date", "time", "party_size", "name", "phone"]
-                })
-            elif func_name == "schedule_appointment":
-                functions.append({
-                    "name": "schedule_appointment", 
-                    "description": "Schedule a dental appointment",
-                    "parameters": ["date", "time", "service_type", "patient_name", "phone"]
-                })
-            elif func_name == "take_order":
-                functions.append({
-                    "name": "take_order",
-                    "description": "Take a pizza order",
-                    "parameters": ["items", "size", "quantity", "customer_info", "delivery_address"]
-                })
-                
-        return functions
+        # Definitions are shared, read-only dicts - specs only ever serialise them
+        return [self.FUNCTION_DEFINITIONS[name] for name in template.functions if name in self.FUNCTION_DEFINITIONS]
+
+
+class _BaseDemoAgent(Agent):
+    """Tools shared by every demo agent; subclasses add the business-specific ones"""
+
+    DEFAULT_BUSINESS_NAME = "our business"
+
+    def __init__(self, spec: ProcessedAgentSpec):
+        super().__init__(instructions=spec.instructions)
+        self._business_name = spec.business_context.get("business_name") or self.DEFAULT_BUSINESS_NAME
+
+    # KNOWLEDGE BASE TOOLS - Available to all demo agents (including car dealerships)
+    @function_tool
+    async def search_knowledge_base(self, query: str, max_results: int = 3):
+        """Search the company knowledge base for information"""
+        return await KnowledgeBaseTools.search_knowledge_base(query, max_results)
+
+    @function_tool
+    async def answer_detailed_question(self, question: str):
+        """Get a detailed answer to a specific question from the knowledge base"""
+        return await KnowledgeBaseTools.answer_detailed_question(question)
+
+    @function_tool
+    async def get_product_specifications(self, product_name: str):
+        """Get technical specifications for a specific product"""
+        return await KnowledgeBaseTools.get_product_specifications(product_name)
+
+    @function_tool
+    async def end_demo(self):
+        """End the demo session"""
+        return "Thank you for trying out the demo! This gives you an idea of how your custom voice agent would work. Would you like to speak with Voxie again to make adjustments or discuss next steps?"
+
+    @function_tool
+    async def handoff_to_voxie(self):
+        """Handoff back to Voxie for feedback"""
+        logger.info("Demo agent requesting handoff back to Voxie")
+        # Must not be awaited here: the handoff waits for this session's playout and
+        # then closes it, which would block on (and cancel) this very tool call
+        _spawn(agent_manager.handoff_back_to_voxie(agent_manager.room))
+        return "Let me connect you back to Voxie now..."
+
+
+class RestaurantDemoAgent(_BaseDemoAgent):
+    DEFAULT_BUSINESS_NAME = "our restaurant"
+
+    @function_tool
+    async def take_reservation(self, date: str, time: str, party_size: str, name: str, phone: str = ""):
+        """Take a restaurant reservation"""
+        logger.info("Demo agent taking reservation: %s for %s people on %s at %s", name, party_size, date, time)
+        return f"Perfect! I've made a reservation at {self._business_name} for {name} for {party_size} people on {date} at {time}. We'll see you then!"
+
+    @function_tool
+    async def menu_inquiry(self, item: str = ""):
+        """Handle menu inquiries"""
+        logger.info("Demo agent handling menu inquiry for: %s", item)
+        if item:
+            return f"Great choice! Our {item} is one of our most popular dishes. It's made with fresh ingredients and comes with a side of your choice."
+        else:
+            return f"We have a wonderful menu. What would you like to know more about?"
+
+    @function_tool
+    async def take_order(self, items: str, customer_name: str, phone: str = "", address: str = ""):
+        """Take a food order"""
+        logger.info("Demo agent taking order: %s for %s", items, customer_name)
+        return f"Excellent! I've got your order for {items}. That'll be ready in about 25-30 minutes at {self._business_name}. Thank you!"
+
+
+class MedicalDemoAgent(_BaseDemoAgent):
+    DEFAULT_BUSINESS_NAME = "our facility"
+
+    @function_tool
+    async def schedule_appointment(self, date: str, time: str, patient_name: str, phone: str, service_type: str = "consultation"):
+        """Schedule a medical/dental appointment"""
+        logger.info("Demo agent scheduling appointment: %s on %s at %s", patient_name, date, time)
+        return f"I've scheduled your {service_type} appointment at {self._business_name} for {patient_name} on {date} at {time}. We'll send you a confirmation shortly."
+
+    @function_tool
+    async def check_insurance(self, insurance_provider: str, member_id: str = ""):
+        """Check insurance coverage"""
+        logger.info("Demo agent checking insurance: %s", insurance_provider)
+        return f"I can help you verify your {insurance_provider} coverage. We are in-network with most major providers. Let me check your benefits."
+
+    @function_tool
+    async def emergency_info(self):
+        """Provide emergency contact information"""
+        return "For emergencies outside business hours, please call our emergency line. If this is a medical emergency, please call 911 immediately."
+
+
+class RetailDemoAgent(_BaseDemoAgent):
+    DEFAULT_BUSINESS_NAME = "our store"
+
+    @function_tool
+    async def check_product_availability(self, product_name: str):
+        """Check if a product is in stock"""
+        logger.info("Demo agent checking product availability: %s", product_name)
+        return f"Let me check our inventory for {product_name}. Yes, we have that in stock! Would you like me to hold one for you?"
+
+    @function_tool
+    async def store_hours(self):
+        """Provide store hours"""
+        return "We're open Monday through Saturday 9 AM to 8 PM, and Sunday 11 AM to 6 PM."
+
+
+class GeneralDemoAgent(_BaseDemoAgent):
+    @function_tool
+    async def general_inquiry(self, topic: str, customer_name: str = ""):
+        """Handle general business inquiries"""
+        logger.info("Demo agent handling general inquiry: %s", topic)
+        return f"Thank you for contacting {self._business_name}! I'd be happy to help you with {topic}. Let me provide you with that information."
+
+    @function_tool
+    async def business_hours(self):
+        """Provide business hours"""
+        return "We're typically open Monday through Friday 9 AM to 5 PM. Would you like me to check our specific hours for today?"
 
 
 class DemoAgentCreator:
@@ -1072,223 +1583,149 @@ class DemoAgentCreator:
         logger.info(f"Creating demo agent: {spec.agent_type}")
         
         # Get business type to determine which agent class to create
-        business_type = spec.business_context.get("business_type", "general")
-        
-        if "restaurant" in business_type.lower() or "pizza" in business_type.lower():
-            return DemoAgentCreator._create_restaurant_agent(spec)
-        elif "dental" in business_type.lower() or "medical" in business_type.lower():
-            return DemoAgentCreator._create_medical_agent(spec)
-        elif "retail" in business_type.lower():
-            return DemoAgentCreator._create_retail_agent(spec)
-        else:
-            return DemoAgentCreator._create_general_agent(spec)
+        business_type = spec.business_context.get("business_type") or "general"
+        builder = DemoAgentCreator._BUILDERS.get(
+            business_type.lower(), DemoAgentCreator._create_general_agent
+        )
+        return builder(spec)
     
     @staticmethod
     def _create_restaurant_agent(spec: ProcessedAgentSpec):
         """Create restaurant-specific demo agent"""
-        class RestaurantDemoAgent(Agent):
-            def __init__(self):
-                super().__init__(instructions=spec.instructions)
-
-            @function_tool
-            async def take_reservation(self, date: str, time: str, party_size: str, name: str, phone: str = ""):
-                """Take a restaurant reservation"""
-                business_name = spec.business_context.get("business_name", "our restaurant")
-                logger.info(f"Demo agent taking reservation: {name} for {party_size} people on {date} at {time}")
-                return f"Perfect! I've made a reservation at {business_name} for {name} for {party_size} people on {date} at {time}. We'll see you then!"
-
-            @function_tool
-            async def menu_inquiry(self, item: str = ""):
-                """Handle menu inquiries"""
-                logger.info(f"Demo agent handling menu inquiry for: {item}")
-                if item:
-                    return f"Great choice! Our {item} is one of our most popular dishes. It's made with fresh ingredients and comes with a side of your choice."
-                else:
-                    return f"We have a wonderful menu. What would you like to know more about?"
-
-            @function_tool
-            async def take_order(self, items: str, customer_name: str, phone: str = "", address: str = ""):
-                """Take a food order"""
-                business_name = spec.business_context.get("business_name", "our restaurant")
-                logger.info(f"Demo agent taking order: {items} for {customer_name}")
-                return f"Excellent! I've got your order for {items}. That'll be ready in about 25-30 minutes at {business_name}. Thank you!"
-
-            # KNOWLEDGE BASE TOOLS - Available to all restaurant agents
-            @function_tool
-            async def search_knowledge_base(self, query: str, max_results: int = 3):
-                """Search the company knowledge base for information"""
-                return await KnowledgeBaseTools.search_knowledge_base(query, max_results)
-
-            @function_tool
-            async def answer_detailed_question(self, question: str):
-                """Get a detailed answer to a specific question from the knowledge base"""
-                return await KnowledgeBaseTools.answer_detailed_question(question)
-
-            @function_tool
-            async def get_product_specifications(self, product_name: str):
-                """Get technical specifications for a specific product"""
-                return await KnowledgeBaseTools.get_product_specifications(product_name)
-                
-            @function_tool
-            async def end_demo(self):
-                """End the demo session"""
-                return "Thank you for trying out the demo! This gives you an idea of how your custom voice agent would work. Would you like to speak with Voxie again to make adjustments or discuss next steps?"
-            
-            @function_tool
-            async def handoff_to_voxie(self):
-                """Handoff back to Voxie for feedback"""
-                logger.info("Demo agent requesting handoff back to Voxie")
-                # Trigger handoff in manager
-                asyncio.create_task(agent_manager.handoff_back_to_voxie(agent_manager.room))
-                return "Let me connect you back to Voxie now..."
-        
-        return RestaurantDemoAgent()
+        return RestaurantDemoAgent(spec)
     
     @staticmethod
     def _create_medical_agent(spec: ProcessedAgentSpec):
         """Create medical/dental-specific demo agent"""
-        class MedicalDemoAgent(Agent):
-            def __init__(self):
-                super().__init__(instructions=spec.instructions)
-                
-            @function_tool
-            async def schedule_appointment(self, date: str, time: str, patient_name: str, phone: str, service_type: str = "consultation"):
-                """Schedule a medical/dental appointment"""
-                business_name = spec.business_context.get("business_name", "our facility")
-                logger.info(f"Demo agent scheduling appointment: {patient_name} on {date} at {time}")
-                return f"I've scheduled your {service_type} appointment at {business_name} for {patient_name} on {date} at {time}. We'll send you a confirmation shortly."
-            
-            @function_tool
-            async def check_insurance(self, insurance_provider: str, member_id: str = ""):
-                """Check insurance coverage"""
-                logger.info(f"Demo agent checking insurance: {insurance_provider}")
-                return f"I can help you verify your {insurance_provider} coverage. We are in-network with most major providers. Let me check your benefits."
-            
-            @function_tool
-            async def emergency_info(self):
-                """Provide emergency contact information"""
-                return "For emergencies outside business hours, please call our emergency line. If this is a medical emergency, please call 911 immediately."
-
-            # KNOWLEDGE BASE TOOLS - Available to all medical agents
-            @function_tool
-            async def search_knowledge_base(self, query: str, max_results: int = 3):
-                """Search the company knowledge base for information"""
-                return await KnowledgeBaseTools.search_knowledge_base(query, max_results)
-
-            @function_tool
-            async def answer_detailed_question(self, question: str):
-                """Get a detailed answer to a specific question from the knowledge base"""
-                return await KnowledgeBaseTools.answer_detailed_question(question)
-
-            @function_tool
-            async def get_product_specifications(self, product_name: str):
-                """Get technical specifications for a specific product"""
-                return await KnowledgeBaseTools.get_product_specifications(product_name)
-                
-            @function_tool
-            async def end_demo(self):
-                """End the demo session"""
-                return "Thank you for trying out the demo! This gives you an idea of how your custom voice agent would work. Would you like to speak with Voxie again to make adjustments or discuss next steps?"
-            
-            @function_tool
-            async def handoff_to_voxie(self):
-                """Handoff back to Voxie for feedback"""
-                logger.info("Demo agent requesting handoff back to Voxie")
-                # Trigger handoff in manager
-                asyncio.create_task(agent_manager.handoff_back_to_voxie(agent_manager.room))
-                return "Let me connect you back to Voxie now..."
-        
-        return MedicalDemoAgent()
+        return MedicalDemoAgent(spec)
     
     @staticmethod
     def _create_retail_agent(spec: ProcessedAgentSpec):
         """Create retail-specific demo agent"""
-        class RetailDemoAgent(Agent):
-            def __init__(self):
-                super().__init__(instructions=spec.instructions)
-                
-            @function_tool
-            async def check_product_availability(self, product_name: str):
-                """Check if a product is in stock"""
-                logger.info(f"Demo agent checking product availability: {product_name}")
-                return f"Let me check our inventory for {product_name}. Yes, we have that in stock! Would you like me to hold one for you?"
-            
-            @function_tool
-            async def store_hours(self):
-                """Provide store hours"""
-                return "We're open Monday through Saturday 9 AM to 8 PM, and Sunday 11 AM to 6 PM."
-                
-            @function_tool
-            async def end_demo(self):
-                """End the demo session"""
-                return "Thank you for trying out the demo! This gives you an idea of how your custom voice agent would work. Would you like to speak with Voxie again to make adjustments or discuss next steps?"
-            
-            @function_tool
-            async def handoff_to_voxie(self):
-                """Handoff back to Voxie for feedback"""
-                logger.info("Demo agent requesting handoff back to Voxie")
-                # Trigger handoff in manager
-                asyncio.create_task(agent_manager.handoff_back_to_voxie(agent_manager.room))
-                return "Let me connect you back to Voxie now..."
-        
-        return RetailDemoAgent()
+        return RetailDemoAgent(spec)
     
     @staticmethod
     def _create_general_agent(spec: ProcessedAgentSpec):
         """Create general business demo agent"""
-        class GeneralDemoAgent(Agent):
-            def __init__(self):
-                super().__init__(instructions=spec.instructions)
-                
-            @function_tool
-            async def general_inquiry(self, topic: str, customer_name: str = ""):
-                """Handle general business inquiries"""
-                business_name = spec.business_context.get("business_name", "our business")
-                logger.info(f"Demo agent handling general inquiry: {topic}")
-                return f"Thank you for contacting {business_name}! I'd be happy to help you with {topic}. Let me provide you with that information."
-            
-            @function_tool
-            async def business_hours(self):
-                """Provide business hours"""
-                return "We're typically open Monday through Friday 9 AM to 5 PM. Would you like me to check our specific hours for today?"
-
-            # KNOWLEDGE BASE TOOLS - Available to all general agents (including car dealerships)
-            @function_tool
-            async def search_knowledge_base(self, query: str, max_results: int = 3):
-                """Search the company knowledge base for information"""
-                return await KnowledgeBaseTools.search_knowledge_base(query, max_results)
-
-            @function_tool
-            async def answer_detailed_question(self, question: str):
-                """Get a detailed answer to a specific question from the knowledge base"""
-                return await KnowledgeBaseTools.answer_detailed_question(question)
-
-            @function_tool
-            async def get_product_specifications(self, product_name: str):
-                """Get technical specifications for a specific product"""
-                return await KnowledgeBaseTools.get_product_specifications(product_name)
-                
-            @function_tool
-            async def end_demo(self):
-                """End the demo session"""
-                return "Thank you for trying out the demo! This gives you an idea of how your custom voice agent would work. Would you like to speak with Voxie again to make adjustments or discuss next steps?"
-            
-            @function_tool
-            async def handoff_to_voxie(self):
-                """Handoff back to Voxie for feedback"""
-                logger.info("Demo agent requesting handoff back to Voxie")
-                # Trigger handoff in manager
-                asyncio.create_task(agent_manager.handoff_back_to_voxie(agent_manager.room))
-                return "Let me connect you back to Voxie now..."
-        
-        return GeneralDemoAgent()
+        return GeneralDemoAgent(spec)
+
+    # Canonical business types (see ProcessingAgent.process_requirements) -> builder
+    _BUILDERS = {
+        "restaurant": _create_restaurant_agent,
+        "pizza": _create_restaurant_agent,
+        "dental": _create_medical_agent,
+        "medical": _create_medical_agent,
+        "retail": _create_retail_agent,
+    }
+
+
+@lru_cache(maxsize=128)
+def _render_greeting_instructions(agent_type: str, business_name: str, greeting: Optional[str]) -> str:
+    """Opening instructions for an agent loaded from the database (cached per agent)"""
+    if greeting:
+        return f"Say this exact greeting: {greeting}"
+    return f"Greet the user warmly as the {agent_type} for {business_name}. Introduce yourself and ask how you can help them today."
+
+
+# Loggers streamed to the frontend when backend logging is enabled
+BACKEND_LOGGER_NAMES = ("multi-agent", "call-analytics", "transcription")
+
+
+def _install_backend_log_handler(handler):
+    """Attach the backend handler to each streamed logger, unless this session's is already there"""
+    for name in BACKEND_LOGGER_NAMES:
+        target = logging.getLogger(name)
+        if not any(
+            isinstance(existing, BackendLogHandler) and existing.session_id == handler.session_id
+            for existing in target.handlers
+        ):
+            target.addHandler(handler)
+
+
+def _remove_backend_log_handler(handler):
+    """Detach the backend handler so a reused worker doesn't accumulate handlers"""
+    for name in BACKEND_LOGGER_NAMES:
+        logging.getLogger(name).removeHandler(handler)
+
+
+# Max seconds the disconnect handler waits on a database write
+DISCONNECT_DB_TIMEOUT = 2.0
+
+
+async def _handle_room_disconnect():
+    """Handle room disconnect - auto-generate summary for calls >3 minutes"""
+    logger.info("🔌 Room disconnected - checking if summary should be generated...")
+
+    # Don't leave a process_requirements task running for a caller who has gone
+    await agent_manager.cleanup()
+
+    if agent_manager.analytics and agent_manager.transcription:
+        try:
+            # Check call duration (start time is recorded by analytics.start_call)
+            started_at = agent_manager.analytics.started_at
+            if agent_manager.analytics.call_session_id and started_at:
+                duration_seconds = (datetime.now(timezone.utc) - started_at).total_seconds()
+                logger.info(f"⏱️ Call duration: {duration_seconds:.0f} seconds")
+
+                # Make sure background transcript writes have landed
+                await agent_manager.transcription.flush()
+
+                # Mark call as completed - bounded so a slow database can't stall teardown
+                try:
+                    await asyncio.wait_for(
+                        agent_manager.analytics.end_call(
+                            call_status='completed',
+                            sentiment='neutral'
+                        ),
+                        timeout=DISCONNECT_DB_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️ Ending call timed out after {DISCONNECT_DB_TIMEOUT}s, skipping summary")
+                    duration_seconds = 0
+
+                # Only generate summary if call was longer than 3 minutes (180 seconds)
+                if duration_seconds >= 180:
+                    logger.info("✅ Call duration >= 3 minutes, generating summary...")
+
+                    # Generate summary
+                    summary = await agent_manager.transcription.generate_summary_and_log()
+
+                    if summary:
+                        logger.info(f"✅ Auto-generated summary: {summary.get('call_category')} - {summary.get('business_outcome')}")
+                    else:
+                        logger.warning("⚠️ Summary generation failed")
+                else:
+                    logger.info(f"⏭️ Call too short ({duration_seconds:.0f}s < 180s), skipping summary")
+
+        except Exception as e:
+            logger.exception(f"❌ Error in disconnect handler: {e}")
+
+    # Detach the handler first so nothing logged while flushing restarts its sender, then flush
+    handler = agent_manager.backend_log_handler
+    if handler:
+        agent_manager.backend_log_handler = None
+        _remove_backend_log_handler(handler)
+        await handler.aclose()
+
+
+def _register_disconnect_handler(ctx: agents.JobContext):
+    """Attach the disconnect handler to the room once"""
+    if agent_manager.disconnect_handler_room is ctx.room:
+        return
+    ctx.room.on("disconnected")(_handle_room_disconnect)
+    agent_manager.disconnect_handler_room = ctx.room
 
 
 async def entrypoint(ctx: agents.JobContext):
     """Main entry point - starts with Voxie agent OR specific agent if AGENT_ID is set"""
 
+    # Catch-all for errors in tasks nobody awaits (keep any handler the framework installed)
+    loop = asyncio.get_running_loop()
+    if loop.get_exception_handler() is None:
+        loop.set_exception_handler(_log_loop_exception)
+
     # Check if a specific agent should be loaded from the database
-    agent_id = os.getenv("AGENT_ID")
+    agent_id = CONFIG.agent_id
 
     if agent_id:
         logger.info(f"🎯 Loading specific agent from database: {agent_id}")
@@ -1296,6 +1733,11 @@ async def entrypoint(ctx: agents.JobContext):
         return
 
     # Otherwise, start with Voxie (the agent creation flow)
+    await _bootstrap_voxie(ctx)
+
+
+async def _bootstrap_voxie(ctx: agents.JobContext):
+    """Start the Voxie agent creation flow in this room"""
     logger.info("Starting multi-agent system with Voxie")
 
     # Store room and context reference for handoffs
@@ -1303,13 +1745,12 @@ async def entrypoint(ctx: agents.JobContext):
     agent_manager.context = ctx
 
     # Initialize analytics tracking
-    import uuid
-    # Make session_id unique by appending UUID (room name alone can be reused)
-    session_id = f"{ctx.room.name}_{uuid.uuid4().hex[:8]}"
+    # Make session_id unique by appending a random suffix (room name alone can be reused)
+    session_id = f"{ctx.room.name}_{token_hex(4)}"
 
     # ✨ Setup Backend Logging (Auto-stream ALL logs to frontend)
-    if BACKEND_LOGGING_AVAILABLE and os.getenv("ENABLE_BACKEND_LOGGING", "false").lower() == "true":
-        backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
+    if BACKEND_LOGGING_AVAILABLE and CONFIG.backend_logging:
+        backend_url = CONFIG.backend_url
 
         try:
             # Create backend logging handler
@@ -1317,12 +1758,9 @@ async def entrypoint(ctx: agents.JobContext):
                 session_id=session_id,
                 backend_url=backend_url
             )
-            backend_handler.setFormatter(logging.Formatter('%(message)s'))
-
             # Add handler to all relevant loggers
-            logging.getLogger("multi-agent").addHandler(backend_handler)
-            logging.getLogger("call-analytics").addHandler(backend_handler)
-            logging.getLogger("transcription").addHandler(backend_handler)
+            _install_backend_log_handler(backend_handler)
+            agent_manager.backend_log_handler = backend_handler
 
             logger.info(f"✅ Backend logging enabled for session: {session_id}")
             logger.info(f"🌐 Frontend can connect to: {backend_url}/api/agents/create-stream/{session_id}")
@@ -1335,25 +1773,27 @@ async def entrypoint(ctx: agents.JobContext):
         customer_phone=None  # Extract from metadata if available
     )
 
-    # Start call tracking
-    await agent_manager.analytics.start_call(
-        room_name=ctx.room.name,
-        primary_agent_type="voxie"
+    # Start call tracking while the transcription handler loads its tokenizer.
+    # The thread is listed first so it is already running while start_call
+    # blocks on the (sync) Supabase insert.
+    agent_manager.transcription, _ = await asyncio.gather(
+        asyncio.to_thread(TranscriptionHandler, analytics=agent_manager.analytics),
+        agent_manager.analytics.start_call(
+            room_name=ctx.room.name,
+            primary_agent_type="voxie"
+        )
     )
     logger.info(f"📊 Analytics started for session: {session_id}")
-
-    # Initialize transcription handler
-    agent_manager.transcription = TranscriptionHandler(analytics=agent_manager.analytics)
     logger.info("🎙️ Transcription handler initialized")
 
-    # Add initial greeting to transcript (for testing)
-    await agent_manager.transcription.on_agent_speech(
+    # Add initial greeting to transcript (for testing) without delaying session start
+    agent_manager.transcription.schedule_write(agent_manager.transcription.on_agent_speech(
         "Hello! I'm Voxie, your AI assistant helping you create custom voice AI agents for your business. What type of business would you like to create an agent for?"
-    )
+    ))
 
     # Start with Voxie agent
     session = AgentSession(
-        llm=openai.realtime.RealtimeModel(voice="marin")  # Voxie's voice
+        llm=get_realtime_model(VOXIE_VOICE)
     )
 
     agent_manager.current_session = session
@@ -1371,58 +1811,7 @@ async def entrypoint(ctx: agents.JobContext):
     )
 
     # Set up room disconnect handler to auto-generate summaries
-    @ctx.room.on("disconnected")
-    async def on_room_disconnected():
-        """Handle room disconnect - auto-generate summary for calls >3 minutes"""
-        logger.info("🔌 Room disconnected - checking if summary should be generated...")
-
-        if agent_manager.analytics and agent_manager.transcription:
-            try:
-                # Check call duration
-                call_start = agent_manager.analytics.call_session_id
-                if call_start:
-                    # Fetch call session to check duration
-                    import sys
-                    sys.path.append('./function_call')
-                    from supabase_client import supabase_client
-                    from datetime import datetime, timezone
-
-                    result = supabase_client.client.table('call_sessions').select('started_at').eq('id', call_start).execute()
-
-                    if result.data and len(result.data) > 0:
-                        started_at_str = result.data[0]['started_at']
-                        started_at = datetime.fromisoformat(started_at_str.replace('Z', '+00:00'))
-                        now = datetime.now(timezone.utc)
-                        duration_seconds = (now - started_at).total_seconds()
-
-                        logger.info(f"⏱️ Call duration: {duration_seconds:.0f} seconds")
-
-                        # Only generate summary if call was longer than 3 minutes (180 seconds)
-                        if duration_seconds >= 180:
-                            logger.info("✅ Call duration >= 3 minutes, generating summary...")
-
-                            # Mark call as completed
-                            await agent_manager.analytics.end_call(
-                                call_status='completed',
-                                sentiment='neutral'
-                            )
-
-                            # Generate summary
-                            summary = await agent_manager.transcription.generate_summary_and_log()
-
-                            if summary:
-                                logger.info(f"✅ Auto-generated summary: {summary.get('call_category')} - {summary.get('business_outcome')}")
-                            else:
-                                logger.warning("⚠️ Summary generation failed")
-                        else:
-                            logger.info(f"⏭️ Call too short ({duration_seconds:.0f}s < 180s), skipping summary")
-                            # Still mark as completed
-                            await agent_manager.analytics.end_call(call_status='completed')
-
-            except Exception as e:
-                logger.error(f"❌ Error in disconnect handler: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
+    _register_disconnect_handler(ctx)
 
 
 async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
@@ -1435,14 +1824,13 @@ async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
 
     try:
         # Load agent from database
-        agent_data = AgentPersistence.load_agent_config(agent_id)
+        agent_data = await asyncio.to_thread(AgentPersistence.load_agent_config, agent_id)
 
         if not agent_data:
             logger.error(f"❌ Agent not found in database: {agent_id}")
             logger.info("⚠️ Falling back to Voxie agent")
-            # Fall back to Voxie - but clear AGENT_ID to prevent infinite loop
-            os.environ.pop("AGENT_ID", None)
-            await entrypoint(ctx)
+            # Fall back to Voxie directly (re-entering entrypoint would retry AGENT_ID)
+            await _bootstrap_voxie(ctx)
             return
 
         logger.info(f"✅ Loaded agent from database")
@@ -1479,8 +1867,7 @@ async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
         agent_manager.state = AgentState.DEMO_ACTIVE
 
         # Initialize analytics
-        import uuid
-        session_id = f"{ctx.room.name}_{uuid.uuid4().hex[:8]}"
+        session_id = f"{ctx.room.name}_{token_hex(4)}"
 
         agent_manager.analytics = CallAnalytics(
             session_id=session_id,
@@ -1488,14 +1875,15 @@ async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
             customer_phone=None
         )
 
-        await agent_manager.analytics.start_call(
-            room_name=ctx.room.name,
-            primary_agent_type=agent_manager.processed_spec.agent_type
+        # Start call tracking while the transcription handler loads its tokenizer
+        agent_manager.transcription, _ = await asyncio.gather(
+            asyncio.to_thread(TranscriptionHandler, analytics=agent_manager.analytics),
+            agent_manager.analytics.start_call(
+                room_name=ctx.room.name,
+                primary_agent_type=agent_manager.processed_spec.agent_type
+            )
         )
         logger.info(f"📊 Analytics started for session: {session_id}")
-
-        # Initialize transcription handler
-        agent_manager.transcription = TranscriptionHandler(analytics=agent_manager.analytics)
         logger.info("🎙️ Transcription handler initialized")
 
         # Create the demo agent
@@ -1506,7 +1894,7 @@ async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
         # Start session with the demo agent
         logger.info(f"🎵 Starting session with voice: {agent_manager.processed_spec.voice}")
         session = AgentSession(
-            llm=openai.realtime.RealtimeModel(voice=agent_manager.processed_spec.voice)
+            llm=get_realtime_model(agent_manager.processed_spec.voice)
         )
 
         agent_manager.current_session = session
@@ -1527,81 +1915,32 @@ async def start_specific_agent(ctx: agents.JobContext, agent_id: str):
 
         if greeting:
             logger.info(f"💬 Using custom greeting: {greeting[:50]}...")
-            await session.generate_reply(instructions=f"Say this exact greeting: {greeting}")
         else:
             logger.info(f"💬 Using default greeting")
-            await session.generate_reply(
-                instructions=f"Greet the user warmly as the {agent_manager.processed_spec.agent_type} for {business_name}. Introduce yourself and ask how you can help them today."
-            )
+        await session.generate_reply(
+            instructions=_render_greeting_instructions(agent_manager.processed_spec.agent_type, business_name, greeting)
+        )
 
         logger.info(f"🎉 {agent_manager.processed_spec.agent_type} is now active in room {ctx.room.name}")
 
         # Set up room disconnect handler to auto-generate summaries
-        @ctx.room.on("disconnected")
-        async def on_room_disconnected():
-            """Handle room disconnect - auto-generate summary for calls >3 minutes"""
-            logger.info("🔌 Room disconnected - checking if summary should be generated...")
-
-            if agent_manager.analytics and agent_manager.transcription:
-                try:
-                    # Check call duration
-                    call_start = agent_manager.analytics.call_session_id
-                    if call_start:
-                        # Fetch call session to check duration
-                        import sys
-                        sys.path.append('./function_call')
-                        from supabase_client import supabase_client
-                        from datetime import datetime, timezone
-
-                        result = supabase_client.client.table('call_sessions').select('started_at').eq('id', call_start).execute()
-
-                        if result.data and len(result.data) > 0:
-                            started_at_str = result.data[0]['started_at']
-                            started_at = datetime.fromisoformat(started_at_str.replace('Z', '+00:00'))
-                            now = datetime.now(timezone.utc)
-                            duration_seconds = (now - started_at).total_seconds()
-
-                            logger.info(f"⏱️ Call duration: {duration_seconds:.0f} seconds")
-
-                            # Only generate summary if call was longer than 3 minutes (180 seconds)
-                            if duration_seconds >= 180:
-                                logger.info("✅ Call duration >= 3 minutes, generating summary...")
-
-                                # Mark call as completed
-                                await agent_manager.analytics.end_call(
-                                    call_status='completed',
-                                    sentiment='neutral'
-                                )
-
-                                # Generate summary
-                                summary = await agent_manager.transcription.generate_summary_and_log()
-
-                                if summary:
-                                    logger.info(f"✅ Auto-generated summary: {summary.get('call_category')} - {summary.get('business_outcome')}")
-                                else:
-                                    logger.warning("⚠️ Summary generation failed")
-                            else:
-                                logger.info(f"⏭️ Call too short ({duration_seconds:.0f}s < 180s), skipping summary")
-                                # Still mark as completed
-                                await agent_manager.analytics.end_call(call_status='completed')
-
-                except Exception as e:
-                    logger.error(f"❌ Error in disconnect handler: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
+        _register_disconnect_handler(ctx)
 
     except Exception as e:
-        logger.error(f"❌ Failed to start specific agent: {e}")
-        logger.error(f"Error details: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"❌ Failed to start specific agent: {e}")
         raise
 
 
+def prewarm(proc: agents.JobProcess):
+    """Build Voxie's realtime model before the first job arrives"""
+    get_realtime_model(VOXIE_VOICE)
+
+
 if __name__ == "__main__":
     # CRITICAL: Set num_idle_processes=0 to prevent multiple workers from spawning
     # This ensures ONLY ONE agent joins each room
     agents.cli.run_app(agents.WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
         num_idle_processes=0  # Don't pre-spawn idle worker processes
     ))
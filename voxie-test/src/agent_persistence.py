@@ -2,15 +2,26 @@
 Agent Persistence - Records agent configurations for reproducibility
 """
 
+import copy
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
-from supabase_client import supabase_client
+from typing import Dict, Any, Optional, Tuple
+
+# Columns load_agent_config actually reads (the agents row carries much more)
+AGENT_CONFIG_COLUMNS = 'id, name, prompt_text, voice, prompt_variables, settings, created_at'
+
+# Loaded configs are reused for this long (seconds) - an agent row doesn't change mid-call
+AGENT_CONFIG_TTL = 300
+AGENT_CONFIG_CACHE_MAXSIZE = 1024
 
 
 class AgentPersistence:
     """Save and load agent configurations"""
 
+    # agent_id -> (expires_at, config); callers always get their own deep copy
+    _config_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
     @staticmethod
     def save_agent_config(
         user_requirements: Dict[str, Any],
@@ -25,8 +36,12 @@ class AgentPersistence:
             agent_id if successful
         """
         try:
+            # Imported on first use so loading this module doesn't connect to Supabase
+            from supabase_client import supabase_client
+
             business_name = user_requirements.get('business_name', 'Unknown')
             business_type = user_requirements.get('business_type', 'general')
+            now = datetime.now(timezone.utc).isoformat()
 
             agent_data = {
                 'id': str(uuid.uuid4()),
@@ -57,14 +72,15 @@ class AgentPersistence:
                 'status_type': 'testing',
                 'visibility': 'listed',
                 'access_mode': 'open',
-                'created_at': datetime.now(timezone.utc).isoformat(),
-                'updated_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now,
+                'updated_at': now
             }
 
             response = supabase_client.client.table('agents').insert(agent_data).execute()
 
             if response.data:
                 agent_id = response.data[0]['id']
+                AgentPersistence._config_cache.pop(agent_id, None)
                 print(f"✅ Agent saved: {agent_id}")
                 print(f"   Business: {business_name}")
                 print(f"   Type: {business_type}")
@@ -79,32 +95,51 @@ class AgentPersistence:
 
     @staticmethod
     def load_agent_config(agent_id: str) -> Optional[Dict[str, Any]]:
-        """Load agent configuration by ID"""
+        """Load agent configuration by ID (cached for AGENT_CONFIG_TTL seconds)"""
+        cached = AgentPersistence._config_cache.get(agent_id)
+        if cached and cached[0] > time.monotonic():
+            return copy.deepcopy(cached[1])
+
         try:
-            response = supabase_client.client.table('agents').select('*').eq('id', agent_id).execute()
+            from supabase_client import supabase_client
+
+            response = supabase_client.client.table('agents')\
+                .select(AGENT_CONFIG_COLUMNS)\
+                .eq('id', agent_id)\
+                .limit(1)\
+                .execute()
 
             if response.data and len(response.data) > 0:
                 agent = response.data[0]
-                print(f"✅ Loaded agent: {agent.get('name')}")
+                name = agent.get('name')
+                settings = agent.get('settings') or {}
+                print(f"✅ Loaded agent: {name}")
 
-                return {
+                config = {
                     'agent_id': agent.get('id'),
                     'user_requirements': agent.get('prompt_variables', {}),
                     'processed_spec': {
-                        'agent_type': agent.get('name'),
+                        'agent_type': name,
                         'instructions': agent.get('prompt_text'),
                         'voice': agent.get('voice'),
-                        'functions': agent.get('settings', {}).get('functions', []),
-                        'sample_responses': agent.get('settings', {}).get('sample_responses', []),
-                        'business_context': agent.get('settings', {}).get('business_context', {})
+                        'functions': settings.get('functions', []),
+                        'sample_responses': settings.get('sample_responses', []),
+                        'business_context': settings.get('business_context', {})
                     },
                     'metadata': {
-                        'session_id': agent.get('settings', {}).get('session_id'),
-                        'room_id': agent.get('settings', {}).get('room_id'),
+                        'session_id': settings.get('session_id'),
+                        'room_id': settings.get('room_id'),
                         'created_at': agent.get('created_at')
                     }
                 }
 
+                cache = AgentPersistence._config_cache
+                if len(cache) >= AGENT_CONFIG_CACHE_MAXSIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del cache[next(iter(cache))]
+                cache[agent_id] = (time.monotonic() + AGENT_CONFIG_TTL, config)
+                return copy.deepcopy(config)
+
             return None
 
         except Exception as e:
@@ -115,6 +150,8 @@ class AgentPersistence:
     def list_agents(business_name: Optional[str] = None, limit: int = 20) -> list:
         """List saved agents"""
         try:
+            from supabase_client import supabase_client
+
             query = supabase_client.client.table('agents').select('id, name, tagline, category, voice, created_at')
 
             if business_name:
@@ -5,271 +5,273 @@ Real-time monitoring of call costs, quality, and performance
 
 import asyncio
 import sys
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from supabase_client import supabase_client
 
+STATUS_EMOJI = {
+    'completed': '✅',
+    'active': '🟢',
+    'failed': '❌',
+    'abandoned': '⚠️'
+}
+
+# Columns the recent-calls list and the call details screen actually print
+RECENT_CALL_COLUMNS = 'id, started_at, call_status, duration_seconds, call_rating, agents(name)'
+CALL_DETAIL_COLUMNS = (
+    'session_id, room_name, started_at, ended_at, duration_seconds, call_status, '
+    'call_rating, customer_sentiment, customer_phone, full_transcript, recording_url'
+)
+
+# Summary views only move every few minutes - reuse their results for this long (seconds)
+VIEW_CACHE_TTL = 60
+
+# cache key -> (expires_at, response)
+_view_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+async def _execute(query):
+    """Run a Supabase query off the event loop (supabase-py is sync)"""
+    return await asyncio.to_thread(query.execute)
+
+
+async def _execute_cached(key: str, query):
+    """_execute() for summary views, reusing a result for VIEW_CACHE_TTL seconds"""
+    cached = _view_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    result = await _execute(query)
+    _view_cache[key] = (time.monotonic() + VIEW_CACHE_TTL, result)
+    return result
+
+
+def _header(title: str) -> List[str]:
+    """Start a screen's output buffer with its banner"""
+    return ["\n" + "="*80, title, "="*80 + "\n"]
+
+
+def _write(lines: List[str], into: Optional[List[str]] = None):
+    """Write a screen's buffered lines to stdout in one go (or hand them to the caller's buffer)"""
+    if into is not None:
+        into.extend(lines)
+        return
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 
 class AnalyticsDashboard:
     """Simple CLI dashboard for call analytics"""
 
     @staticmethod
-    async def show_overview():
+    async def show_overview(into: Optional[List[str]] = None):
         """Show high-level overview of all metrics"""
-        print("\n" + "="*80)
-        print(" 📊 CALL ANALYTICS DASHBOARD")
-        print("="*80 + "\n")
+        out = _header(" 📊 CALL ANALYTICS DASHBOARD")
 
-        # Today's stats
+        # The three queries are independent - run them side by side (supabase-py is sync)
         today = datetime.now(timezone.utc).date()
-        result = supabase_client.client.table('daily_cost_summary')\
+        today_query = supabase_client.client.table('daily_cost_summary')\
             .select('*')\
-            .eq('date', str(today))\
-            .execute()
+            .eq('date', str(today))
+        active_query = supabase_client.client.table('active_calls').select('*')
+        week_query = supabase_client.client.table('daily_cost_summary')\
+            .select('*')\
+            .order('date', desc=True)\
+            .limit(7)
+        result, active, week = await asyncio.gather(
+            _execute_cached(f'daily_cost_summary:{today}', today_query),
+            _execute(active_query),
+            _execute_cached('daily_cost_summary:week', week_query),
+        )
 
+        # Today's stats
+        out.append(f"📅 TODAY ({today})")
         if result.data:
             stats = result.data[0]
-            print(f"📅 TODAY ({today})")
-            print(f"   Calls: {stats.get('total_calls', 0)}")
-            print(f"   Completed: {stats.get('completed_calls', 0)}")
-            print(f"   Total Tokens: {stats.get('total_tokens', 0):,}")
-            print(f"   Total Cost: ${stats.get('total_cost_usd', 0):.2f}")
-            print(f"   Avg Rating: {stats.get('avg_rating', 0) or 'N/A'}")
+            out.append(f"   Calls: {stats.get('total_calls', 0)}")
+            out.append(f"   Completed: {stats.get('completed_calls', 0)}")
+            out.append(f"   Total Tokens: {stats.get('total_tokens', 0):,}")
+            out.append(f"   Total Cost: ${stats.get('total_cost_usd', 0):.2f}")
+            out.append(f"   Avg Rating: {stats.get('avg_rating', 0) or 'N/A'}")
         else:
-            print(f"📅 TODAY ({today})")
-            print("   No calls yet today")
+            out.append("   No calls yet today")
 
-        print()
+        out.append("")
 
         # Active calls
-        active = supabase_client.client.table('active_calls').select('*').execute()
-        print(f"🟢 ACTIVE CALLS: {len(active.data)}")
-        if active.data:
-            for call in active.data[:5]:
-                print(f"   • {call['agent_name'] or 'Unknown'} | "
-                      f"{call['duration_so_far_seconds']}s | "
-                      f"${call['cost_so_far_usd']:.4f}")
-        print()
+        out.append(f"🟢 ACTIVE CALLS: {len(active.data)}")
+        for call in active.data[:5]:
+            out.append(f"   • {call['agent_name'] or 'Unknown'} | "
+                       f"{call['duration_so_far_seconds']}s | "
+                       f"${call['cost_so_far_usd']:.4f}")
+        out.append("")
 
         # Last 7 days trend
-        result = supabase_client.client.table('daily_cost_summary')\
-            .select('*')\
-            .order('date', desc=True)\
-            .limit(7)\
-            .execute()
-
-        print("📈 LAST 7 DAYS")
+        out.append("📈 LAST 7 DAYS")
         total_week_cost = 0
-        for day in result.data:
+        for day in week.data:
             total_week_cost += day.get('total_cost_usd', 0)
-            print(f"   {day['date']}: "
-                  f"{day.get('total_calls', 0)} calls | "
-                  f"${day.get('total_cost_usd', 0):.2f}")
+            out.append(f"   {day['date']}: "
+                       f"{day.get('total_calls', 0)} calls | "
+                       f"${day.get('total_cost_usd', 0):.2f}")
 
-        print(f"\n   💰 Week Total: ${total_week_cost:.2f}")
-        print()
+        out.append(f"\n   💰 Week Total: ${total_week_cost:.2f}")
+        out.append("")
+        _write(out, into)
 
     @staticmethod
-    async def show_agent_performance():
+    async def show_agent_performance(into: Optional[List[str]] = None):
         """Show agent performance leaderboard"""
-        print("\n" + "="*80)
-        print(" 🏆 AGENT PERFORMANCE LEADERBOARD (Last 30 Days)")
-        print("="*80 + "\n")
+        out = _header(" 🏆 AGENT PERFORMANCE LEADERBOARD (Last 30 Days)")
 
-        result = supabase_client.client.table('agent_performance').select('*').execute()
+        result = await _execute_cached('agent_performance', supabase_client.client.table('agent_performance').select('*'))
 
         if not result.data:
-            print("   No agent data available\n")
+            out.append("   No agent data available\n")
+            _write(out, into)
             return
 
-        print(f"{'Agent Name':<30} {'Calls':>8} {'Avg Cost':>10} {'Rating':>8} {'Sales':>8}")
-        print("-" * 80)
+        out.append(f"{'Agent Name':<30} {'Calls':>8} {'Avg Cost':>10} {'Rating':>8} {'Sales':>8}")
+        out.append("-" * 80)
 
         for agent in result.data[:10]:
-            print(f"{agent['name'][:30]:<30} "
-                  f"{agent.get('total_calls', 0):>8} "
-                  f"${agent.get('avg_cost_per_call', 0):>9.2f} "
-                  f"{agent.get('avg_rating', 0) or 'N/A':>8} "
-                  f"{agent.get('sales_count', 0):>8}")
+            out.append(f"{agent['name'][:30]:<30} "
+                       f"{agent.get('total_calls', 0):>8} "
+                       f"${agent.get('avg_cost_per_call', 0):>9.2f} "
+                       f"{agent.get('avg_rating', 0) or 'N/A':>8} "
+                       f"{agent.get('sales_count', 0):>8}")
 
-        print()
+        out.append("")
+        _write(out, into)
 
     @staticmethod
     async def show_expensive_calls(limit: int = 10):
         """Show most expensive calls"""
-        print("\n" + "="*80)
-        print(f" 💸 TOP {limit} MOST EXPENSIVE CALLS")
-        print("="*80 + "\n")
+        out = _header(f" 💸 TOP {limit} MOST EXPENSIVE CALLS")
+
+        # Summed and ranked in Postgres - see get_expensive_calls in README
+        result = await _execute(supabase_client.client.rpc('get_expensive_calls', {
+            'days': 7,
+            'lim': limit
+        }))
+
+        out.append(f"{'Date':<20} {'Duration':>10} {'Tokens':>12} {'Cost':>10}")
+        out.append("-" * 80)
 
-        # Query for expensive calls
-        query = """
-        SELECT
-          cs.id,
-          cs.session_id,
-          cs.started_at,
-          cs.duration_seconds,
-          a.name as agent_name,
-          SUM(tu.total_tokens) as total_tokens,
-          SUM(tu.total_cost_usd) as total_cost
-        FROM call_sessions cs
-        LEFT JOIN agents a ON cs.agent_id = a.id
-        LEFT JOIN token_usage tu ON tu.session_id = cs.id
-        WHERE cs.started_at >= NOW() - INTERVAL '7 days'
-        GROUP BY cs.id, a.name
-        ORDER BY total_cost DESC
-        LIMIT $1
-        """
-
-        # Since we can't run raw SQL easily, we'll fetch and process
-        sessions = supabase_client.client.table('call_sessions')\
-            .select('id, session_id, started_at, duration_seconds')\
-            .order('started_at', desc=True)\
-            .limit(100)\
-            .execute()
-
-        # Get token usage for each
-        call_costs = []
-        for session in sessions.data:
-            tokens = supabase_client.client.table('token_usage')\
-                .select('total_tokens, total_cost_usd')\
-                .eq('call_session_id', session['id'])\
-                .execute()
-
-            if tokens.data:
-                total_cost = sum(t['total_cost_usd'] for t in tokens.data)
-                total_tokens = sum(t['total_tokens'] for t in tokens.data)
-                call_costs.append({
-                    **session,
-                    'total_cost': total_cost,
-                    'total_tokens': total_tokens
-                })
-
-        # Sort by cost
-        call_costs.sort(key=lambda x: x['total_cost'], reverse=True)
-
-        print(f"{'Date':<20} {'Duration':>10} {'Tokens':>12} {'Cost':>10}")
-        print("-" * 80)
-
-        for call in call_costs[:limit]:
+        for call in result.data:
             date_str = call['started_at'][:19] if call['started_at'] else 'N/A'
-            duration = call.get('duration_seconds', 0) or 0
-            print(f"{date_str:<20} "
-                  f"{duration:>10}s "
-                  f"{call.get('total_tokens', 0):>12,} "
-                  f"${call.get('total_cost', 0):>9.2f}")
+            out.append(f"{date_str:<20} "
+                       f"{call['duration_seconds'] or 0:>10}s "
+                       f"{call['total_tokens']:>12,} "
+                       f"${call['total_cost']:>9.2f}")
 
-        print()
+        out.append("")
+        _write(out)
 
     @staticmethod
-    async def show_recent_calls(limit: int = 10):
+    async def show_recent_calls(limit: int = 10, into: Optional[List[str]] = None):
         """Show recent calls with details"""
-        print("\n" + "="*80)
-        print(f" 📞 RECENT CALLS (Last {limit})")
-        print("="*80 + "\n")
+        out = _header(f" 📞 RECENT CALLS (Last {limit})")
 
-        result = supabase_client.client.table('call_sessions')\
-            .select('*, agents(name)')\
-            .order('started_at', desc=True)\
-            .limit(limit)\
-            .execute()
+        result = await _execute(supabase_client.client.table('call_sessions')
+            .select(RECENT_CALL_COLUMNS)
+            .order('started_at', desc=True)
+            .limit(limit))
 
         if not result.data:
-            print("   No recent calls\n")
+            out.append("   No recent calls\n")
+            _write(out, into)
             return
 
         for idx, call in enumerate(result.data, 1):
-            agent_name = call.get('agents', {}).get('name', 'Unknown') if call.get('agents') else 'Unknown'
-            status_emoji = {
-                'completed': '✅',
-                'active': '🟢',
-                'failed': '❌',
-                'abandoned': '⚠️'
-            }.get(call['call_status'], '❓')
-
-            print(f"[{idx}] {status_emoji} {call['started_at'][:19]}")
-            print(f"    Agent: {agent_name}")
-            print(f"    Status: {call['call_status']}")
-            if call.get('duration_seconds'):
-                print(f"    Duration: {call['duration_seconds']}s")
-            if call.get('call_rating'):
-                print(f"    Rating: {call['call_rating']}/10")
-            print()
+            agent_name = (call.get('agents') or {}).get('name', 'Unknown')
+            status = call['call_status']
+
+            out.append(f"[{idx}] {STATUS_EMOJI.get(status, '❓')} {call['started_at'][:19]}\n"
+                       f"    Agent: {agent_name}\n"
+                       f"    Status: {status}")
+            if duration := call.get('duration_seconds'):
+                out.append(f"    Duration: {duration}s")
+            if rating := call.get('call_rating'):
+                out.append(f"    Rating: {rating}/10")
+            out.append("")
+        _write(out, into)
 
         return result.data
 
     @staticmethod
     async def view_call_details(call_id: str):
         """View detailed information about a specific call"""
-        print("\n" + "="*80)
-        print(" 📋 CALL DETAILS")
-        print("="*80 + "\n")
-
-        # Get call session
-        result = supabase_client.client.table('call_sessions')\
-            .select('*')\
-            .eq('id', call_id)\
-            .execute()
+        out = _header(" 📋 CALL DETAILS")
+
+        # Call session and its token usage are independent - fetch both at once
+        result, tokens = await asyncio.gather(
+            _execute(supabase_client.client.table('call_sessions')
+                .select(CALL_DETAIL_COLUMNS)
+                .eq('id', call_id)),
+            _execute(supabase_client.client.table('token_usage')
+                .select('total_tokens, total_cost_usd')
+                .eq('call_session_id', call_id)),
+        )
 
         if not result.data:
-            print("❌ Call not found\n")
+            out.append("❌ Call not found\n")
+            _write(out)
             return None
 
         call = result.data[0]
 
         # Basic info
-        print(f"📞 Session ID: {call['session_id']}")
-        print(f"🏢 Room: {call.get('room_name', 'N/A')}")
-        print(f"📅 Started: {call['started_at']}")
+        out.append(f"📞 Session ID: {call['session_id']}")
+        out.append(f"🏢 Room: {call.get('room_name', 'N/A')}")
+        out.append(f"📅 Started: {call['started_at']}")
         if call.get('ended_at'):
-            print(f"🏁 Ended: {call['ended_at']}")
-        print(f"⏱️  Duration: {call.get('duration_seconds', 0)}s")
-        print(f"📊 Status: {call['call_status']}")
+            out.append(f"🏁 Ended: {call['ended_at']}")
+        out.append(f"⏱️  Duration: {call.get('duration_seconds', 0)}s")
+        out.append(f"📊 Status: {call['call_status']}")
         if call.get('call_rating'):
-            print(f"⭐ Rating: {call['call_rating']}/10")
+            out.append(f"⭐ Rating: {call['call_rating']}/10")
         if call.get('customer_sentiment'):
-            print(f"😊 Sentiment: {call['customer_sentiment']}")
+            out.append(f"😊 Sentiment: {call['customer_sentiment']}")
         if call.get('customer_phone'):
-            print(f"📱 Customer: {call['customer_phone']}")
+            out.append(f"📱 Customer: {call['customer_phone']}")
 
         # Token usage
-        tokens = supabase_client.client.table('token_usage')\
-            .select('*')\
-            .eq('call_session_id', call_id)\
-            .execute()
-
         if tokens.data:
             total_cost = sum(t['total_cost_usd'] for t in tokens.data)
             total_tokens = sum(t['total_tokens'] for t in tokens.data)
-            print(f"\n💰 Cost: ${total_cost:.4f}")
-            print(f"🔢 Tokens: {total_tokens:,}")
+            out.append(f"\n💰 Cost: ${total_cost:.4f}")
+            out.append(f"🔢 Tokens: {total_tokens:,}")
 
         # Transcript
         if call.get('full_transcript'):
             lines = call['full_transcript'].split('\n')
-            print(f"\n📝 Transcript ({len(lines)} lines):")
-            print("─" * 80)
+            out.append(f"\n📝 Transcript ({len(lines)} lines):")
+            out.append("─" * 80)
             # Show first 10 lines
-            for line in lines[:10]:
-                print(f"   {line}")
+            out.extend(f"   {line}" for line in lines[:10])
             if len(lines) > 10:
-                print(f"   ... ({len(lines) - 10} more lines)")
+                out.append(f"   ... ({len(lines) - 10} more lines)")
 
         # Recording
         if call.get('recording_url'):
-            print(f"\n🎙️  Recording: {call['recording_url']}")
+            out.append(f"\n🎙️  Recording: {call['recording_url']}")
 
-        print()
+        out.append("")
+        _write(out)
         return call
 
     @staticmethod
-    async def edit_call(call_id: str):
-        """Edit call metadata"""
+    async def edit_call(call_id: str, call: Optional[Dict[str, Any]] = None):
+        """Edit call metadata (pass call if its details are already on screen)"""
         print("\n" + "="*80)
         print(" ✏️  EDIT CALL")
         print("="*80 + "\n")
 
-        # First show current details
-        call = await AnalyticsDashboard.view_call_details(call_id)
+        # First show current details, unless the caller just did
+        if call is None:
+            call = await AnalyticsDashboard.view_call_details(call_id)
         if not call:
             return
 
@@ -354,10 +356,11 @@ class AnalyticsDashboard:
         # Update in Supabase
         if update_data:
             try:
-                supabase_client.client.table('call_sessions')\
-                    .update(update_data)\
-                    .eq('id', call_id)\
-                    .execute()
+                await _execute(supabase_client.client.table('call_sessions')
+                    .update(update_data)
+                    .eq('id', call_id))
+                # Ratings/status feed the summary views
+                _view_cache.clear()
                 print("\n✅ Call updated successfully!\n")
             except Exception as e:
                 print(f"\n❌ Failed to update: {e}\n")
@@ -365,54 +368,27 @@ class AnalyticsDashboard:
     @staticmethod
     async def show_cost_breakdown():
         """Show cost breakdown by model and interaction type"""
-        print("\n" + "="*80)
-        print(" 💰 COST BREAKDOWN (Last 7 Days)")
-        print("="*80 + "\n")
+        out = _header(" 💰 COST BREAKDOWN (Last 7 Days)")
 
-        # By model
-        result = supabase_client.client.rpc('get_cost_by_model', {
-            'days': 7
-        }).execute() if hasattr(supabase_client.client, 'rpc') else None
-
-        if not result or not result.data:
-            # Fallback: manual aggregation
-            week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-            tokens = supabase_client.client.table('token_usage')\
-                .select('model, total_tokens, total_cost_usd, interaction_type')\
-                .gte('recorded_at', week_ago)\
-                .execute()
-
-            # Aggregate by model
-            by_model = {}
-            by_type = {}
-
-            for token in tokens.data:
-                model = token['model']
-                itype = token['interaction_type']
-
-                if model not in by_model:
-                    by_model[model] = {'tokens': 0, 'cost': 0, 'count': 0}
-                by_model[model]['tokens'] += token['total_tokens']
-                by_model[model]['cost'] += token['total_cost_usd']
-                by_model[model]['count'] += 1
-
-                if itype not in by_type:
-                    by_type[itype] = {'tokens': 0, 'cost': 0, 'count': 0}
-                by_type[itype]['tokens'] += token['total_tokens']
-                by_type[itype]['cost'] += token['total_cost_usd']
-                by_type[itype]['count'] += 1
-
-            print("📊 BY MODEL:")
-            for model, data in sorted(by_model.items(), key=lambda x: x[1]['cost'], reverse=True):
-                print(f"   {model:<25} {data['count']:>6} calls | "
-                      f"{data['tokens']:>12,} tokens | ${data['cost']:>8.2f}")
-
-            print("\n📊 BY INTERACTION TYPE:")
-            for itype, data in sorted(by_type.items(), key=lambda x: x[1]['cost'], reverse=True):
-                print(f"   {itype:<25} {data['count']:>6} calls | "
-                      f"{data['tokens']:>12,} tokens | ${data['cost']:>8.2f}")
+        # Aggregated in Postgres - see get_cost_by_model / get_cost_by_interaction_type in README
+        params = {'days': 7}
+        by_model, by_type = await asyncio.gather(
+            _execute(supabase_client.client.rpc('get_cost_by_model', params)),
+            _execute(supabase_client.client.rpc('get_cost_by_interaction_type', params)),
+        )
 
-        print()
+        out.append("📊 BY MODEL:")
+        for row in by_model.data:
+            out.append(f"   {row['model']:<25} {row['call_count']:>6} calls | "
+                       f"{row['total_tokens']:>12,} tokens | ${row['total_cost']:>8.2f}")
+
+        out.append("\n📊 BY INTERACTION TYPE:")
+        for row in by_type.data:
+            out.append(f"   {row['interaction_type']:<25} {row['call_count']:>6} calls | "
+                       f"{row['total_tokens']:>12,} tokens | ${row['total_cost']:>8.2f}")
+
+        out.append("")
+        _write(out)
 
 
 async def main_menu():
@@ -452,19 +428,24 @@ async def main_menu():
                     call_idx = int(call_num) - 1
                     if 0 <= call_idx < len(calls):
                         call_id = calls[call_idx]['id']
-                        await AnalyticsDashboard.view_call_details(call_id)
+                        call = await AnalyticsDashboard.view_call_details(call_id)
 
                         edit = input("\nEdit this call? (y/n): ").strip().lower()
                         if edit == 'y':
-                            await AnalyticsDashboard.edit_call(call_id)
+                            await AnalyticsDashboard.edit_call(call_id, call)
                     elif call_num != '0':
                         print("❌ Invalid call number")
                 except ValueError:
                     print("❌ Invalid input")
         elif choice == '7':
-            await AnalyticsDashboard.show_overview()
-            await AnalyticsDashboard.show_agent_performance()
-            await AnalyticsDashboard.show_recent_calls()
+            # Fetch all three screens at once, then print them in menu order
+            overview, performance, recent = [], [], []
+            await asyncio.gather(
+                AnalyticsDashboard.show_overview(into=overview),
+                AnalyticsDashboard.show_agent_performance(into=performance),
+                AnalyticsDashboard.show_recent_calls(into=recent),
+            )
+            _write(overview + performance + recent)
         elif choice == '0':
             print("\n👋 Goodbye!\n")
             break
@@ -480,6 +461,6 @@ if __name__ == "__main__":
 
     try:
         asyncio.run(main_menu())
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, EOFError):
         print("\n\n👋 Dashboard closed\n")
         sys.exit(0)
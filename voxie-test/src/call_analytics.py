@@ -3,6 +3,7 @@ Call Analytics & Token Tracking System
 Integrates with LiveKit agents to track costs, quality, and conversation intelligence
 """
 
+import asyncio
 import uuid
 import logging
 import os
@@ -74,6 +75,7 @@ class CallAnalytics:
         self.customer_id = customer_id
 
         self.call_session_id: Optional[str] = None
+        self.started_at: Optional[datetime] = None
         self.turn_number = 0
         self.total_cost_accumulated = 0.0
 
@@ -128,6 +130,7 @@ class CallAnalytics:
             logger.info(f"✅ Supabase connection working, found {len(test_result.data)} records")
 
             # Insert call session
+            started_at = datetime.now(timezone.utc)
             print(f"📝 DEBUG: Inserting call session for room: {room_name}")
             logger.info(f"📝 Inserting call session for room: {room_name}")
             result = supabase_client.client.table('call_sessions').insert({
@@ -140,7 +143,7 @@ class CallAnalytics:
                 'call_status': 'active',
                 'primary_agent_type': primary_agent_type,
                 'agent_transitions': [],
-                'started_at': datetime.now(timezone.utc).isoformat()
+                'started_at': started_at.isoformat()
             }).execute()
 
             print(f"🔍 DEBUG: Insert result data: {result.data}")
@@ -150,6 +153,7 @@ class CallAnalytics:
                 return None
 
             self.call_session_id = result.data[0]['id']
+            self.started_at = started_at
             print(f"📞 DEBUG: Call started: {self.call_session_id} | Room: {room_name}")
             logger.info(f"📞 Call started: {self.call_session_id} | Room: {room_name}")
             return self.call_session_id
@@ -330,14 +334,16 @@ class CallAnalytics:
             return
 
         try:
-            supabase_client.client.table('call_sessions').update({
+            # supabase-py is sync - run in a thread so callers can bound it with a timeout
+            query = supabase_client.client.table('call_sessions').update({
                 'ended_at': datetime.now(timezone.utc).isoformat(),
                 'call_status': call_status,
                 'call_rating': rating,
                 'call_rating_reason': rating_reason,
                 'customer_sentiment': sentiment,
                 'issue_resolved': issue_resolved
-            }).eq('id', self.call_session_id).execute()
+            }).eq('id', self.call_session_id)
+            await asyncio.to_thread(query.execute)
 
             logger.info(
                 f"📞 Call ended: {call_status} "
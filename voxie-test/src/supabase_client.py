@@ -3,11 +3,42 @@ Supabase Client for Voxie - Agent Persistence
 """
 
 import os
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import Client
+from postgrest import SyncPostgrestClient
 
 load_dotenv(".env.local")
 
+# Seconds before a PostgREST request gives up (the library default is two minutes)
+POSTGREST_TIMEOUT = 10
+CONNECT_TIMEOUT = 2
+
+# Keep pooled REST connections around between queries (httpx drops idle ones after 5s by default)
+POSTGREST_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30.0)
+
+
+class _PooledClient(Client):
+    """Supabase client whose PostgREST calls all go through one dedicated keep-alive pool
+
+    The pool isn't passed as ClientOptions(httpx_client=...): that client is shared with
+    auth/storage/functions, which each rewrite its base_url and headers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.rest_http = httpx.Client(
+            http2=True,
+            limits=POSTGREST_LIMITS,
+            timeout=httpx.Timeout(POSTGREST_TIMEOUT, connect=CONNECT_TIMEOUT),
+            follow_redirects=True,
+        )
+        super().__init__(*args, **kwargs)
+
+    def _init_postgrest_client(self, rest_url, headers, schema, *args, **kwargs):
+        # Called again after auth events - every rebuild keeps reusing the same pool
+        return SyncPostgrestClient(rest_url, headers=headers, schema=schema, http_client=self.rest_http)
+
+
 class SupabaseClient:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
@@ -16,7 +47,8 @@ class SupabaseClient:
         if not self.url or not self.key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set")
 
-        self.client: Client = create_client(self.url, self.key)
+        # One client per process: table()/rpc() reuse its pooled PostgREST connections
+        self.client: Client = _PooledClient.create(self.url, self.key)
         print(f"✅ Supabase connected: {self.url}")
 
 supabase_client = SupabaseClient()
@@ -4,10 +4,11 @@ Transcribes user and agent audio in parallel without affecting latency
 Accumulates transcript in memory for end-of-call summary generation
 """
 
+import asyncio
 import logging
 import time
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from dataclasses import dataclass
 import tiktoken
 
@@ -46,6 +47,7 @@ class TranscriptionHandler:
         self.total_input_tokens_estimate = 0
         self.total_output_tokens_estimate = 0
         self.call_start_time = time.time()
+        self.pending_writes: Set[asyncio.Task] = set()  # Background transcript writes
 
         # Initialize tiktoken for token estimation
         try:
@@ -136,6 +138,22 @@ class TranscriptionHandler:
 
         logger.info(f"🤖 Agent ({tokens} tokens): {transcript_text[:80]}...")
 
+    def schedule_write(self, coro) -> asyncio.Task:
+        """
+        Run a transcript write in the background (off the caller's critical path)
+
+        The task is tracked so flush() can wait for it before the call ends.
+        """
+        task = asyncio.create_task(coro)
+        self.pending_writes.add(task)
+        task.add_done_callback(self.pending_writes.discard)
+        return task
+
+    async def flush(self):
+        """Wait for any background transcript writes to finish"""
+        if self.pending_writes:
+            await asyncio.gather(*self.pending_writes, return_exceptions=True)
+
     def get_full_conversation_text(self) -> str:
         """
         Build full conversation as formatted text
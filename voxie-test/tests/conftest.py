@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# supabase_client connects at import time - give it placeholder settings
+# (nothing in the unit tests talks to the real project)
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+
+# backend_log_handler lives at the repository root, next to the backend
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+
+import agent
+from agent import AgentManager, AgentState, ProcessingAgent, UserRequirements
+
+
+class FakeSession:
+    """Stand-in for AgentSession that records calls and can fail on start()"""
+
+    def __init__(self, fail_start: bool = False, fail_reply: bool = False, **kwargs):
+        self.fail_start = fail_start
+        self.fail_reply = fail_reply
+        self.started = False
+        self.closed = False
+
+    def generate_reply(self, **kwargs):
+        if self.fail_reply:
+            raise RuntimeError("reply failed")
+        return asyncio.sleep(0)
+
+    async def start(self, **kwargs):
+        if self.fail_start:
+            raise RuntimeError("start failed")
+        self.started = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _requirements(**fields) -> UserRequirements:
+    requirements = UserRequirements()
+    for name, value in fields.items():
+        requirements.set_field(name, value)
+    return requirements
+
+
+@pytest.fixture
+def spec_cache(monkeypatch):
+    """Give each test an empty spec cache"""
+    cache = {}
+    monkeypatch.setattr(ProcessingAgent, "_spec_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def new_sessions(monkeypatch):
+    """Replace everything a handoff builds with fakes; returns the sessions it creates"""
+    created = []
+
+    def make_session(**kwargs):
+        session = FakeSession(fail_start=make_session.fail_start)
+        created.append(session)
+        return session
+
+    async def played(handle):
+        await handle
+
+    make_session.fail_start = False
+    monkeypatch.setattr(agent, "AgentSession", make_session)
+    monkeypatch.setattr(agent, "_wait_for_playout", played)
+    monkeypatch.setattr(agent, "get_realtime_model", lambda voice: None)
+    monkeypatch.setattr(agent, "RoomInputOptions", lambda **kwargs: None)
+    monkeypatch.setattr(agent.noise_cancellation, "BVC", lambda: None)
+    monkeypatch.setattr(agent.DemoAgentCreator, "create_agent", staticmethod(lambda spec: None))
+    monkeypatch.setattr(agent, "VoxieAgent", lambda: None)
+    return make_session, created
+
+
+async def _manager_with_spec(state: AgentState) -> AgentManager:
+    manager = AgentManager()
+    manager.processed_spec = await ProcessingAgent().process_requirements(
+        _requirements(business_name="Luigi's", business_type="Italian restaurant")
+    )
+    manager.state = state
+    manager.current_session = FakeSession()
+    return manager
+
+
+def test_summary_cached_until_requirements_change() -> None:
+    """get_summary() is reused between changes and rebuilt after one"""
+    requirements = _requirements(business_name="Acme")
+    summary = requirements.get_summary()
+    assert requirements.get_summary() is summary
+
+    requirements.add_functions(["Bookings"])
+    updated = requirements.get_summary()
+    assert updated is not summary
+    assert "Bookings" in updated
+
+    # A duplicate (case-insensitive) is not a change
+    assert requirements.add_functions(["bookings"]) == []
+    assert requirements.get_summary() is updated
+
+
+def test_cache_key_tracks_content() -> None:
+    """Equal requirements share a cache key; any field change produces a new one"""
+    first = _requirements(business_name="Acme", business_type="SaaS")
+    second = _requirements(business_name="Acme", business_type="SaaS")
+    assert first.cache_key() == second.cache_key()
+
+    second.set_contact("email", "hi@acme.test")
+    assert first.cache_key() != second.cache_key()
+
+
+@pytest.mark.asyncio
+async def test_spec_cache_hands_out_copies(spec_cache) -> None:
+    """Mutating a returned spec never leaks into later cache hits"""
+    requirements = _requirements(business_name="Luigi's", business_type="Italian restaurant")
+    processor = ProcessingAgent()
+
+    # Both the freshly built spec and a cache hit belong to the caller
+    for _ in range(2):
+        spec = await processor.process_requirements(requirements)
+        spec.business_context["business_name"] = "Changed"
+        spec.functions.clear()
+
+    again = await processor.process_requirements(requirements)
+    assert again.business_context["business_name"] == "Luigi's"
+    assert again.functions
+    assert len(spec_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_spec_cache_invalidated_by_requirement_changes(spec_cache) -> None:
+    """A changed requirement misses the cache, and the spec keeps a snapshot of the functions"""
+    requirements = _requirements(business_name="Luigi's", business_type="Italian restaurant")
+    requirements.add_functions(["Reservations"])
+    processor = ProcessingAgent()
+
+    spec = await processor.process_requirements(requirements)
+    requirements.add_functions(["Takeaway orders"])
+    assert spec.business_context["functions"] == ("Reservations",)
+
+    updated = await processor.process_requirements(requirements)
+    assert updated.business_context["functions"] == ("Reservations", "Takeaway orders")
+    assert len(spec_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_handoff_to_demo_failure_restores_demo_ready(spec_cache, new_sessions) -> None:
+    """A demo session that fails to start is closed and the handoff can be retried"""
+    make_session, created = new_sessions
+    make_session.fail_start = True
+    manager = await _manager_with_spec(AgentState.DEMO_READY)
+    voxie_session = manager.current_session
+
+    with pytest.raises(RuntimeError):
+        await manager.handoff_to_demo(room=None)
+
+    assert manager.state == AgentState.DEMO_READY
+    # Voxie's session was already closed - don't hand it back
+    assert voxie_session.closed
+    assert manager.current_session is None
+    assert created[0].closed
+
+    make_session.fail_start = False
+    await manager.handoff_to_demo(room=None)
+    assert manager.state == AgentState.DEMO_ACTIVE
+    assert manager.current_session is created[1]
+
+
+@pytest.mark.asyncio
+async def test_handoff_to_demo_failure_keeps_open_session(spec_cache, new_sessions) -> None:
+    """A failure before Voxie's session closes leaves that session in place"""
+    manager = await _manager_with_spec(AgentState.DEMO_READY)
+    voxie_session = manager.current_session
+    voxie_session.fail_reply = True
+
+    with pytest.raises(RuntimeError):
+        await manager.handoff_to_demo(room=None)
+
+    assert manager.state == AgentState.DEMO_READY
+    assert manager.current_session is voxie_session
+    assert not voxie_session.closed
+
+
+@pytest.mark.asyncio
+async def test_handoff_back_failure_restores_demo_active(spec_cache, new_sessions) -> None:
+    """A Voxie session that fails to start is closed and the manager stays in the demo state"""
+    make_session, created = new_sessions
+    make_session.fail_start = True
+    manager = await _manager_with_spec(AgentState.DEMO_ACTIVE)
+
+    with pytest.raises(RuntimeError):
+        await manager.handoff_back_to_voxie(room=None)
+
+    assert manager.state == AgentState.DEMO_ACTIVE
+    assert manager.current_session is None
+    assert created[0].closed
+
+
+@pytest.mark.asyncio
+async def test_begin_demo_again_only_from_voxie(spec_cache) -> None:
+    """A repeat demo is only armed while Voxie is in control"""
+    manager = await _manager_with_spec(AgentState.HANDOFF_IN_PROGRESS)
+    assert not await manager.begin_demo_again()
+    assert manager.state == AgentState.HANDOFF_IN_PROGRESS
+
+    manager.state = AgentState.VOXIE_ACTIVE
+    assert await manager.begin_demo_again()
+    assert manager.state == AgentState.DEMO_READY
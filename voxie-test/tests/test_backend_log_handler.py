@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+import pytest
+from backend_log_handler import BackendLogHandler
+
+
+class FakeHttpSession:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Fresh handler bookkeeping; batches are captured instead of posted"""
+    monkeypatch.setattr(BackendLogHandler, "_open_handlers", 0)
+    monkeypatch.setattr(BackendLogHandler, "_http_session", None)
+    sent = []
+
+    async def capture(self, events):
+        sent.append(list(events))
+
+    monkeypatch.setattr(BackendLogHandler, "_send_logs", capture)
+    return sent
+
+
+def _logger(handler: BackendLogHandler) -> logging.Logger:
+    logger = logging.getLogger(f"test-backend-{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+@pytest.mark.asyncio
+async def test_records_posted_in_batches(handlers) -> None:
+    """Records logged together go out in one batch, capped at batch_size"""
+    handler = BackendLogHandler("session-1", batch_size=3, flush_interval=0.5)
+    assert handler.batch_url == "http://localhost:8000/api/agents/session-1/log/batch"
+    logger = _logger(handler)
+
+    for i in range(5):
+        logger.info("line %s", i)
+    await asyncio.wait_for(handler.queue.join(), timeout=2)
+
+    assert [len(batch) for batch in handlers] == [3, 2]
+    assert handlers[0][0]["message"] == "line 0"
+    assert handlers[0][0]["status"] == "info"
+
+    logger.removeHandler(handler)
+    await handler.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_then_drops_later_records(handlers) -> None:
+    """aclose() sends what is queued and ignores anything logged afterwards"""
+    handler = BackendLogHandler("session-1", flush_interval=0.01)
+    logger = _logger(handler)
+    logger.warning("before close")
+
+    await handler.aclose()
+    logger.warning("after close")
+    await asyncio.sleep(0.05)
+
+    assert [event["message"] for batch in handlers for event in batch] == ["before close"]
+    assert handler.queue is None
+    await handler.aclose()  # idempotent
+
+
+@pytest.mark.asyncio
+async def test_shared_session_closed_with_last_handler(handlers) -> None:
+    """The pooled HTTP session outlives every handler but the last"""
+    first = BackendLogHandler("session-1")
+    second = BackendLogHandler("session-2")
+    session = FakeHttpSession()
+    BackendLogHandler._http_session = session
+
+    await first.aclose()
+    await first.aclose()
+    assert not session.closed
+
+    await second.aclose()
+    assert session.closed
+    assert BackendLogHandler._http_session is None
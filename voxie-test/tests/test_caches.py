@@ -0,0 +1,114 @@
+import pytest
+
+import agent_persistence
+import analytics_dashboard
+from agent_persistence import AgentPersistence
+from supabase_client import supabase_client
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query builder"""
+
+    def __init__(self, client, data):
+        self.client = client
+        self.data = data
+
+    def __getattr__(self, name):
+        # select/eq/limit/insert/... just keep chaining
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.client.executed += 1
+        return self
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = 0
+
+    def table(self, name):
+        return FakeQuery(self, self.rows)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+AGENT_ROW = {
+    "id": "agent-1",
+    "name": "Luigi's Restaurant Assistant",
+    "prompt_text": "You are Luigi's assistant",
+    "voice": "alloy",
+    "prompt_variables": {"business_name": "Luigi's"},
+    "settings": {"functions": [{"name": "book_table"}], "business_context": {"tone": "warm"}},
+    "created_at": "2025-01-01T00:00:00+00:00",
+}
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient([dict(AGENT_ROW)])
+    monkeypatch.setattr(supabase_client, "client", client)
+    monkeypatch.setattr(AgentPersistence, "_config_cache", {})
+    monkeypatch.setattr(analytics_dashboard, "_view_cache", {})
+    return client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(agent_persistence.time, "monotonic", clock)
+    return clock
+
+
+def test_agent_config_cached_until_ttl(fake_client, clock) -> None:
+    """Repeat loads are served from the cache until AGENT_CONFIG_TTL runs out"""
+    first = AgentPersistence.load_agent_config("agent-1")
+    assert AgentPersistence.load_agent_config("agent-1") == first
+    assert fake_client.executed == 1
+
+    clock.now += agent_persistence.AGENT_CONFIG_TTL + 1
+    AgentPersistence.load_agent_config("agent-1")
+    assert fake_client.executed == 2
+
+
+def test_agent_config_copies_are_independent(fake_client, clock) -> None:
+    """Callers can edit a loaded config without changing later loads"""
+    config = AgentPersistence.load_agent_config("agent-1")
+    config["processed_spec"]["functions"].append({"name": "extra"})
+
+    cached = AgentPersistence.load_agent_config("agent-1")
+    cached["processed_spec"]["business_context"]["tone"] = "curt"
+
+    again = AgentPersistence.load_agent_config("agent-1")
+    assert again["processed_spec"]["functions"] == [{"name": "book_table"}]
+    assert again["processed_spec"]["business_context"] == {"tone": "warm"}
+    assert fake_client.executed == 1
+
+
+def test_saving_agent_drops_its_cached_config(fake_client, clock) -> None:
+    """save_agent_config() invalidates the cache entry for the saved id"""
+    AgentPersistence.load_agent_config("agent-1")
+    assert AgentPersistence.save_agent_config({"business_name": "Luigi's"}, {"agent_type": "Assistant"}) == "agent-1"
+
+    AgentPersistence.load_agent_config("agent-1")
+    assert fake_client.executed == 3
+
+
+@pytest.mark.asyncio
+async def test_view_cache_reused_until_expiry(fake_client) -> None:
+    """Summary views are re-queried only once their cache entry expires"""
+    query = fake_client.table("daily_cost_summary")
+    first = await analytics_dashboard._execute_cached("daily", query)
+    assert await analytics_dashboard._execute_cached("daily", query) is first
+    assert fake_client.executed == 1
+
+    # Expire the entry (the event loop shares time.monotonic, so don't freeze it here)
+    analytics_dashboard._view_cache["daily"] = (0.0, first)
+    await analytics_dashboard._execute_cached("daily", query)
+    assert fake_client.executed == 2